@@ -3,6 +3,7 @@ from flask import Flask, render_template, request, jsonify, redirect, url_for, f
 import os
 import json
 import uuid
+import orjson
 import datetime
 import subprocess
 import requests
@@ -12,6 +13,7 @@ import re
 import bcrypt
 import threading
 import time
+import concurrent.futures
 from werkzeug.utils import secure_filename
 from functools import wraps
 from git import Repo
@@ -738,7 +740,7 @@ def submit():
             # Import redis_client here to ensure it's available in this route
             from redis_client import redis_client
             redis_key = f"request:{request_id}"
-            redis_client.set(redis_key, json.dumps(config_data).encode('utf-8'))
+            redis_client.set(redis_key, orjson.dumps(config_data, option=orjson.OPT_NON_STR_KEYS))
             logger.info(f"Saved configuration to Redis with key: {redis_key}")
         except Exception as redis_error:
             logger.error(f"Error saving to Redis: {str(redis_error)}")
@@ -852,42 +854,41 @@ def list_configs():
         # Import redis_client here to ensure it's available in this route
         from redis_client import redis_client
         # Scan for all keys matching the new request pattern
-        request_keys = redis_client.scan_iter("request:*")
+        request_keys = [key_bytes.decode('utf-8') for key_bytes in redis_client.scan_iter("request:*", count=500)]
         configs = [] # Keep variable name 'configs' for template compatibility
-        for key_bytes in request_keys:
-            key = key_bytes.decode('utf-8')
-            # Fetch the JSON string for the key
-            request_data_json = redis_client.get(key)
+        # Fetch the JSON strings in batches with MGET instead of one GET per key
+        for start in range(0, len(request_keys), 500):
+            batch = request_keys[start:start + 500]
+            for key, request_data_json in zip(batch, redis_client.mget(batch)):
+                if not request_data_json:
+                    logger.warning(f"No data found for request key: {key}")
+                    continue
 
-            if not request_data_json:
-                logger.warning(f"No data found for request key: {key}")
-                continue
-
-            try:
-                # Decode JSON string
-                request_data = json.loads(request_data_json.decode('utf-8'))
-
-                # Basic validation/check if essential data exists
-                if not isinstance(request_data, dict) or 'request_id' not in request_data or 'timestamp' not in request_data:
-                     logger.warning(f"Skipping invalid or incomplete request data for key: {key}")
-                     continue
-
-                # Add derived/default fields if missing for template rendering
-                # The template now expects 'vm_name' directly if available
-                request_data.setdefault('vm_name', 'N/A')
-                request_data.setdefault('build_owner', 'Unknown')
-                request_data.setdefault('build_username', 'unknown')
-                request_data.setdefault('environment', 'N/A')
-                # Add status fields if they are stored, otherwise default
-                request_data.setdefault('plan_status', 'pending')
-                request_data.setdefault('approval_status', 'pending')
-                request_data.setdefault('build_status', 'pending')
-
-                configs.append(request_data)
-
-            except (json.JSONDecodeError, TypeError) as e:
-                 logger.error(f"Error decoding JSON for key {key}: {e}")
-                 continue # Skip this entry
+                try:
+                    # Decode JSON string
+                    request_data = orjson.loads(request_data_json)
+
+                    # Basic validation/check if essential data exists
+                    if not isinstance(request_data, dict) or 'request_id' not in request_data or 'timestamp' not in request_data:
+                         logger.warning(f"Skipping invalid or incomplete request data for key: {key}")
+                         continue
+
+                    # Add derived/default fields if missing for template rendering
+                    # The template now expects 'vm_name' directly if available
+                    request_data.setdefault('vm_name', 'N/A')
+                    request_data.setdefault('build_owner', 'Unknown')
+                    request_data.setdefault('build_username', 'unknown')
+                    request_data.setdefault('environment', 'N/A')
+                    # Add status fields if they are stored, otherwise default
+                    request_data.setdefault('plan_status', 'pending')
+                    request_data.setdefault('approval_status', 'pending')
+                    request_data.setdefault('build_status', 'pending')
+
+                    configs.append(request_data)
+
+                except (json.JSONDecodeError, TypeError) as e:
+                     logger.error(f"Error decoding JSON for key {key}: {e}")
+                     continue # Skip this entry
 
         # Sort configs by timestamp descending (newest first)
         configs.sort(key=lambda x: x.get('timestamp', '0'), reverse=True)
@@ -1396,25 +1397,13 @@ def vsphere_datacenters():
         
         # Try to get datacenters from Redis cache first
         datacenters_key = f"vsphere:{creds_hash}:datacenters"
-        r = vsphere_redis_cache.get_redis_connection()
-        from_cache = False
+        datacenters = vsphere_redis_cache.get_cached_json(datacenters_key)
+        from_cache = bool(datacenters)
         
-        if r:
-            cached_data = r.get(datacenters_key)
-            if cached_data:
-                try:
-                    datacenters = json.loads(cached_data)
-                    from_cache = True
-                    logger.info(f"Using Redis cache for datacenters list ({len(datacenters)} datacenters)")
-                except Exception as json_err:
-                    logger.warning(f"Error parsing cached datacenters: {str(json_err)}")
-                    datacenters = None
-            else:
-                logger.info("No cached datacenters found in Redis")
-                datacenters = None
+        if from_cache:
+            logger.info(f"Using Redis cache for datacenters list ({len(datacenters)} datacenters)")
         else:
-            logger.warning("Could not connect to Redis")
-            datacenters = None
+            logger.info("No cached datacenters found in Redis")
         
         # If cache miss, use hierarchical loader
         if not datacenters:
@@ -1456,25 +1445,13 @@ def vsphere_datacenter_clusters(datacenter_name):
         
         # Try to get clusters from Redis cache first
         dc_clusters_key = f"vsphere:{creds_hash}:datacenter:{datacenter_name}:clusters"
-        r = vsphere_redis_cache.get_redis_connection()
-        from_cache = False
+        clusters = vsphere_redis_cache.get_cached_json(dc_clusters_key)
+        from_cache = bool(clusters)
         
-        if r:
-            cached_data = r.get(dc_clusters_key)
-            if cached_data:
-                try:
-                    clusters = json.loads(cached_data)
-                    from_cache = True
-                    logger.info(f"Using Redis cache for datacenter {datacenter_name} clusters ({len(clusters)} clusters)")
-                except Exception as json_err:
-                    logger.warning(f"Error parsing cached clusters for datacenter {datacenter_name}: {str(json_err)}")
-                    clusters = None
-            else:
-                logger.info(f"No cached clusters found in Redis for datacenter {datacenter_name}")
-                clusters = None
+        if from_cache:
+            logger.info(f"Using Redis cache for datacenter {datacenter_name} clusters ({len(clusters)} clusters)")
         else:
-            logger.warning("Could not connect to Redis")
-            clusters = None
+            logger.info(f"No cached clusters found in Redis for datacenter {datacenter_name}")
         
         # If cache miss, use hierarchical loader
         if not clusters:
@@ -1550,10 +1527,10 @@ def vsphere_hierarchical_cluster_resources(cluster_id):
         
         # First try to get resources from Redis cache
         cached_resources = {
-            'resource_pools': vsphere_redis_cache.get_cached_cluster_resources(cluster_id, 'resource_pools', creds_hash) or [],
-            'datastores': vsphere_redis_cache.get_cached_cluster_resources(cluster_id, 'datastores', creds_hash) or [],
-            'networks': vsphere_redis_cache.get_cached_cluster_resources(cluster_id, 'networks', creds_hash) or [],
-            'templates': vsphere_redis_cache.get_cached_cluster_resources(cluster_id, 'templates', creds_hash) or []
+            resource_type: resources or []
+            for resource_type, resources in vsphere_redis_cache.get_cached_cluster_resources_bulk(
+                cluster_id, ['resource_pools', 'datastores', 'networks', 'templates'], creds_hash
+            ).items()
         }
         
         # Check if we have cached resources
@@ -1627,10 +1604,7 @@ def vsphere_cluster_resources(cluster_id):
         # Filter out local datastores (_local) automatically
         if 'datastores' in resources:
             original_count = len(resources['datastores'])
-            resources['datastores'] = [
-                ds for ds in resources['datastores'] 
-                if "_local" not in ds['name']
-            ]
+            resources['datastores'] = vsphere_cluster_resources.filter_local_datastores(resources['datastores'])
             filtered_count = len(resources['datastores'])
             logger.info(f"Filtered datastores for cluster {resources.get('cluster_name', 'Unknown')}: {original_count} → {filtered_count} (removed {original_count - filtered_count} local datastores)")
         
@@ -1662,6 +1636,11 @@ def ebdc_resources():
         force_refresh = request.args.get('force_refresh', 'false').lower() == 'true'
         resources = vsphere_cluster_resources.get_ebdc_resources(force_refresh=force_refresh)
         
+        # A forced refresh also re-syncs the loaded clusters' cached
+        # resources now rather than at the next sync interval
+        if force_refresh:
+            vsphere_hierarchical_loader.request_sync()
+        
         # Prepare a simplified response structure
         datacenters = []
         for dc_name, clusters in resources.get('clusters_by_datacenter', {}).items():
@@ -1738,19 +1717,25 @@ def connection_status():
         vsphere_user = os.environ.get('VSPHERE_USER', '')
         vsphere_password = os.environ.get('VSPHERE_PASSWORD', '')
         
-        # Test connections
-        vsphere_result = test_vsphere_connection(
-            server=vsphere_server,
-            username=vsphere_user,
-            password=vsphere_password
-        )
-        
         # Import connection test functions
         from atlantis_api import test_atlantis_connection
         from netbox_api import test_netbox_connection
         
-        atlantis_result = test_atlantis_connection()
-        netbox_result = test_netbox_connection()
+        # Test connections concurrently; each is a network round-trip, so the
+        # dashboard poll waits for the slowest service rather than all three
+        with concurrent.futures.ThreadPoolExecutor(max_workers=3) as executor:
+            vsphere_future = executor.submit(
+                test_vsphere_connection,
+                server=vsphere_server,
+                username=vsphere_user,
+                password=vsphere_password
+            )
+            atlantis_future = executor.submit(test_atlantis_connection)
+            netbox_future = executor.submit(test_netbox_connection)
+            
+            vsphere_result = vsphere_future.result()
+            atlantis_result = atlantis_future.result()
+            netbox_result = netbox_future.result()
         
         # Create response with detailed information
         status = {
@@ -1796,7 +1781,7 @@ def view_request(request_id):
 
     try:
         # Decode JSON from Redis
-        request_data = json.loads(request_data_json.decode('utf-8'))
+        request_data = orjson.loads(request_data_json)
     except json.JSONDecodeError:
         logger.error(f"Failed to decode JSON for request {request_id}")
         flash(f"Could not load data for request {request_id}.", "error")
@@ -1845,7 +1830,7 @@ def build_receipt(request_id, timestamp):
     request_data_json = redis_client.get(new_redis_key)
     if request_data_json:
          try:
-             request_data = json.loads(request_data_json.decode('utf-8'))
+             request_data = orjson.loads(request_data_json)
              # Adapt data to fit build_receipt.html template if possible
              # This is a placeholder - template might need rework or data needs mapping
              adapted_data = {
@@ -1891,7 +1876,7 @@ def delete_config(request_id, timestamp):
         return redirect(url_for('list_configs'))
 
     try:
-        request_data = json.loads(request_data_json.decode('utf-8'))
+        request_data = orjson.loads(request_data_json)
     except json.JSONDecodeError:
         flash(f"Could not load data for request {request_id}.", "error")
         return redirect(url_for('list_configs'))
@@ -18,16 +18,21 @@ REDIS_HOST = os.environ.get('REDIS_HOST', 'redis')
 REDIS_PORT = int(os.environ.get('REDIS_PORT', 6379))
 REDIS_DB = int(os.environ.get('REDIS_DB', 0))
 REDIS_PASSWORD = os.environ.get('REDIS_PASSWORD', None)
+REDIS_POOL_SIZE = int(os.environ.get('REDIS_POOL_SIZE', 32))
 
 # Initialize Redis client
 try:
-    redis_client = redis.Redis(
+    # Threads check out their own socket from a bounded pool; when all are in
+    # use, callers wait for one to be returned instead of failing
+    redis_pool = redis.BlockingConnectionPool(
+        max_connections=REDIS_POOL_SIZE,
         host=REDIS_HOST,
         port=REDIS_PORT,
         db=REDIS_DB,
         password=REDIS_PASSWORD,
         decode_responses=False  # Keep binary responses for compatibility
     )
+    redis_client = redis.Redis(connection_pool=redis_pool)
     logger.info(f"Redis client initialized: {REDIS_HOST}:{REDIS_PORT}")
     
     # Test connection
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+vSphere Hierarchical Loader Unit Tests
+
+This module tests the cluster resource sync of VSphereHierarchicalLoader,
+including:
+- Fetching the resource types of a cluster concurrently
+- Giving every fetch worker its own vSphere session
+"""
+import os
+import sys
+import logging
+import threading
+import unittest
+from unittest import mock
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+import vsphere_hierarchical_loader
+
+
+class FakeClusterResources:
+    """Stand-in for VSphereClusterResources that checks it stays on one thread."""
+    
+    instances = []
+    barrier = None
+    
+    def __init__(self, **kwargs):
+        self.thread = threading.current_thread()
+        self.connects = 0
+        self.closed = False
+        self.errors = []
+        FakeClusterResources.instances.append(self)
+        
+        for method in vsphere_hierarchical_loader.SYNC_FETCHERS.values():
+            setattr(self, method, self._fetcher(method))
+    
+    def _check_thread(self):
+        if threading.current_thread() is not self.thread:
+            self.errors.append(threading.current_thread().name)
+    
+    def _fetcher(self, method):
+        def fetch(cluster_obj):
+            self._check_thread()
+            # Every fetch waits for the others, so they must run at once
+            FakeClusterResources.barrier.wait(5)
+            return [{'id': f"{method}-1", 'name': method, 'cluster_id': cluster_obj}]
+        return fetch
+    
+    def connect(self):
+        self._check_thread()
+        self.connects += 1
+        return True
+    
+    def disconnect(self):
+        self._check_thread()
+    
+    def find_cluster_by_id(self, cluster_id):
+        self._check_thread()
+        return None if cluster_id == 'missing' else cluster_id
+    
+    def close(self):
+        self.closed = True
+
+
+class TestClusterSync(unittest.TestCase):
+    """Test syncing one cluster's resources."""
+    
+    def setUp(self):
+        FakeClusterResources.instances = []
+        FakeClusterResources.barrier = threading.Barrier(len(vsphere_hierarchical_loader.SYNC_FETCHERS))
+        patches = [
+            mock.patch.object(vsphere_hierarchical_loader.vsphere_cluster_resources,
+                              'VSphereClusterResources', FakeClusterResources),
+            mock.patch.object(vsphere_hierarchical_loader, 'LAZY_LOADING_ENABLED', False),
+            mock.patch.object(vsphere_hierarchical_loader.VSphereHierarchicalLoader, '_load_from_cache'),
+            mock.patch.object(vsphere_hierarchical_loader.VSphereHierarchicalLoader, '_save_to_cache'),
+        ]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+        
+        self.loader = vsphere_hierarchical_loader.VSphereHierarchicalLoader(
+            server='vcenter.example.com', username='user', password='secret', auto_sync=False)
+        self.addCleanup(self.loader.shutdown)
+        self.loader.resources_by_cluster['domain-c1'] = {
+            res_type: [] for res_type in vsphere_hierarchical_loader.SYNC_FETCHERS}
+    
+    def test_fetches_run_concurrently_on_own_sessions(self):
+        """Each resource type is fetched at once, each worker on its own session."""
+        resources = self.loader._sync_cluster_resources('domain-c1', 'Cluster 1')
+        
+        self.assertIsNotNone(resources)
+        for res_type, method in vsphere_hierarchical_loader.SYNC_FETCHERS.items():
+            self.assertEqual(resources[res_type][0]['name'], method)
+        
+        instances = FakeClusterResources.instances
+        self.assertEqual(len(instances), len(vsphere_hierarchical_loader.SYNC_FETCHERS))
+        self.assertEqual(len({instance.thread for instance in instances}), len(instances))
+        self.assertEqual([error for instance in instances for error in instance.errors], [])
+    
+    def test_sessions_are_reused_between_syncs(self):
+        """A second sync reuses the workers' sessions and shutdown closes them."""
+        self.loader._sync_cluster_resources('domain-c1')
+        self.loader._sync_cluster_resources('domain-c1')
+        
+        instances = FakeClusterResources.instances
+        self.assertEqual(len(instances), len(vsphere_hierarchical_loader.SYNC_FETCHERS))
+        self.assertEqual(sum(instance.connects for instance in instances),
+                         2 * len(vsphere_hierarchical_loader.SYNC_FETCHERS))
+        
+        self.loader.shutdown()
+        self.assertTrue(all(instance.closed for instance in instances))
+    
+    def test_missing_cluster_keeps_existing_resources(self):
+        """A cluster that is gone from vCenter leaves the stored data alone."""
+        FakeClusterResources.barrier = threading.Barrier(1)
+        self.loader.resources_by_cluster['missing'] = {'datastores': [{'id': 'ds-1'}]}
+        
+        self.assertIsNone(self.loader._sync_cluster_resources('missing'))
+        self.assertEqual(self.loader.resources_by_cluster['missing'], {'datastores': [{'id': 'ds-1'}]})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,501 @@
+#!/usr/bin/env python3
+"""
+vSphere Redis Cache Unit Tests
+
+This module tests the Redis cache layer against an in-memory fakeredis
+server, including:
+- Coalescing concurrent loads with load_or_wait
+- The atomic write script and its full-payload resend path
+- Cache statistics derived from the index sets
+- Coalescing of background template loads
+- Starting and flushing the performance measurement writer
+
+fakeredis (with lupa, for the Lua write script) is required; the tests are
+skipped without it.
+"""
+import os
+import sys
+import time
+import logging
+import threading
+import unittest
+from unittest import mock
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+try:
+    import fakeredis
+    import lupa  # noqa: F401 - needed by fakeredis to run Lua scripts
+    FAKEREDIS_AVAILABLE = True
+except ImportError:
+    FAKEREDIS_AVAILABLE = False
+    logger.warning("fakeredis not available. Install with: pip install 'fakeredis[lua]'")
+
+import vsphere_redis_cache
+
+CREDS = 'creds'
+
+
+def make_datastores(count, prefix='ds'):
+    """Build a list of datastore dicts."""
+    return [{'name': f"{prefix}-{i}", 'id': f"datastore-{prefix}-{i}"} for i in range(count)]
+
+
+@unittest.skipUnless(FAKEREDIS_AVAILABLE, "fakeredis[lua] not installed")
+class RedisCacheTestCase(unittest.TestCase):
+    """Base class pointing the cache module at a fresh fakeredis server."""
+    
+    def setUp(self):
+        self.redis = fakeredis.FakeRedis(server=fakeredis.FakeServer())
+        patches = [
+            mock.patch.object(vsphere_redis_cache, '_redis_client', self.redis),
+        ]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+        
+        vsphere_redis_cache._local_cache.clear()
+        vsphere_redis_cache._write_digests.clear()
+        self.addCleanup(vsphere_redis_cache._local_cache.clear)
+        self.addCleanup(vsphere_redis_cache._write_digests.clear)
+    
+    def read(self, cluster_id, resource_type='datastores'):
+        """Read an entry from Redis, bypassing the in-process cache."""
+        vsphere_redis_cache._local_cache.clear()
+        return vsphere_redis_cache.get_cached_cluster_resources(cluster_id, resource_type, CREDS)
+
+
+class TestLoadOrWait(unittest.TestCase):
+    """Test sharing of concurrent loads for the same key."""
+    
+    def test_concurrent_callers_share_one_load(self):
+        """Callers arriving during a load receive its result."""
+        started = threading.Event()
+        release = threading.Event()
+        calls = []
+        
+        def loader():
+            calls.append(1)
+            started.set()
+            release.wait(5)
+            return ['result']
+        
+        results = []
+        leader = threading.Thread(target=lambda: results.append(
+            vsphere_redis_cache.load_or_wait(('test', 'shared'), loader)))
+        leader.start()
+        self.assertTrue(started.wait(5))
+        
+        waiters = [threading.Thread(target=lambda: results.append(
+            vsphere_redis_cache.load_or_wait(('test', 'shared'), loader))) for _ in range(3)]
+        for waiter in waiters:
+            waiter.start()
+        
+        # Let the waiters block on the in-flight load before it finishes
+        time.sleep(0.1)
+        release.set()
+        for thread in [leader] + waiters:
+            thread.join(5)
+        
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(results, [['result']] * 4)
+        self.assertNotIn(('test', 'shared'), vsphere_redis_cache._inflight)
+    
+    def test_waiters_load_themselves_when_leader_fails(self):
+        """A failed load is not shared; waiting callers run the loader."""
+        started = threading.Event()
+        release = threading.Event()
+        
+        def failing_loader():
+            started.set()
+            release.wait(5)
+            raise RuntimeError("vSphere unavailable")
+        
+        errors = []
+        
+        def lead():
+            try:
+                vsphere_redis_cache.load_or_wait(('test', 'failed'), failing_loader)
+            except RuntimeError as e:
+                errors.append(e)
+        
+        leader = threading.Thread(target=lead)
+        leader.start()
+        self.assertTrue(started.wait(5))
+        
+        results = []
+        waiter = threading.Thread(target=lambda: results.append(
+            vsphere_redis_cache.load_or_wait(('test', 'failed'), lambda: 'fallback')))
+        waiter.start()
+        time.sleep(0.1)
+        release.set()
+        leader.join(5)
+        waiter.join(5)
+        
+        self.assertEqual(len(errors), 1)
+        self.assertEqual(results, ['fallback'])
+    
+    def test_sequential_calls_load_again(self):
+        """Results are not cached once the load has finished."""
+        calls = []
+        for _ in range(2):
+            vsphere_redis_cache.load_or_wait(('test', 'sequential'), lambda: calls.append(1))
+        self.assertEqual(len(calls), 2)
+
+
+class TestCacheWrites(RedisCacheTestCase):
+    """Test the atomic write script."""
+    
+    def test_write_and_read_back(self):
+        """Small and compressed lists round-trip through Redis."""
+        small = make_datastores(2)
+        large = make_datastores(2000)
+        self.assertTrue(vsphere_redis_cache.cache_cluster_resources('domain-c1', 'datastores', small, CREDS))
+        self.assertTrue(vsphere_redis_cache.cache_cluster_resources('domain-c2', 'datastores', large, CREDS))
+        
+        self.assertEqual(self.read('domain-c1'), small)
+        self.assertEqual(self.read('domain-c2'), large)
+        
+        # Only compressed entries record their uncompressed size
+        self.assertIsNone(self.redis.hget(vsphere_redis_cache.get_cluster_cache_key('domain-c1', CREDS), 'raw:datastores'))
+        self.assertIsNotNone(self.redis.hget(vsphere_redis_cache.get_cluster_cache_key('domain-c2', CREDS), 'raw:datastores'))
+        
+        self.assertEqual(set(self.redis.zrange(vsphere_redis_cache._index_key(CREDS, 'datastores'), 0, -1)),
+                         {b'domain-c1', b'domain-c2'})
+        self.assertIn(CREDS.encode(), self.redis.smembers(vsphere_redis_cache.CREDS_INDEX_KEY))
+    
+    def test_log_reports_compression_actually_used(self):
+        """Only entries stored compressed are logged as compressed."""
+        with self.assertLogs(vsphere_redis_cache.logger, level='DEBUG') as logs:
+            vsphere_redis_cache.cache_cluster_resources('domain-c1', 'datastores', make_datastores(2), CREDS)
+            vsphere_redis_cache.cache_cluster_resources('domain-c2', 'datastores', make_datastores(2000), CREDS)
+        
+        cached = [line for line in logs.output if 'Cached' in line]
+        self.assertNotIn('(compressed)', cached[0])
+        self.assertIn('(compressed)', cached[1])
+    
+    def test_unchanged_payload_only_refreshes_timestamp(self):
+        """Re-writing the same list skips the payload but bumps the update time."""
+        cluster_key = vsphere_redis_cache.get_cluster_cache_key('domain-c1', CREDS)
+        resources = make_datastores(3)
+        vsphere_redis_cache.cache_cluster_resources('domain-c1', 'datastores', resources, CREDS)
+        first_ts = int(self.redis.hget(cluster_key, 'ts:datastores'))
+        
+        with mock.patch.object(vsphere_redis_cache, '_queue_cache_write',
+                               wraps=vsphere_redis_cache._queue_cache_write) as queue:
+            vsphere_redis_cache.cache_cluster_resources('domain-c1', 'datastores', resources, CREDS)
+        
+        self.assertEqual(queue.call_count, 1)
+        self.assertEqual(queue.call_args[0][3], b'')
+        self.assertGreater(int(self.redis.hget(cluster_key, 'ts:datastores')), first_ts)
+        self.assertEqual(self.read('domain-c1'), resources)
+    
+    def test_missing_entry_is_resent_in_full(self):
+        """If the stored copy is gone, the script asks for the payload again."""
+        resources = make_datastores(3)
+        vsphere_redis_cache.cache_cluster_resources('domain-c1', 'datastores', resources, CREDS)
+        self.redis.delete(vsphere_redis_cache.get_cluster_cache_key('domain-c1', CREDS))
+        
+        with mock.patch.object(vsphere_redis_cache, '_queue_cache_write',
+                               wraps=vsphere_redis_cache._queue_cache_write) as queue:
+            self.assertTrue(vsphere_redis_cache.cache_cluster_resources('domain-c1', 'datastores', resources, CREDS))
+        
+        self.assertEqual(queue.call_count, 2)
+        self.assertEqual(queue.call_args_list[0][0][3], b'')
+        self.assertNotEqual(queue.call_args_list[1][0][3], b'')
+        self.assertEqual(self.read('domain-c1'), resources)
+    
+    def test_other_writer_is_not_served_as_fresh(self):
+        """A list replaced by another writer is overwritten, not kept."""
+        ours = make_datastores(3, prefix='ours')
+        vsphere_redis_cache.cache_cluster_resources('domain-c1', 'datastores', ours, CREDS)
+        our_digests = dict(vsphere_redis_cache._write_digests)
+        
+        # Another process replaces the entry without this process knowing
+        vsphere_redis_cache._write_digests.clear()
+        vsphere_redis_cache.cache_cluster_resources('domain-c1', 'datastores', make_datastores(3, prefix='theirs'), CREDS)
+        vsphere_redis_cache._write_digests.clear()
+        vsphere_redis_cache._write_digests.update(our_digests)
+        
+        vsphere_redis_cache.cache_cluster_resources('domain-c1', 'datastores', ours, CREDS)
+        self.assertEqual(self.read('domain-c1'), ours)
+    
+    def test_batch_write(self):
+        """Several entries are written in one call."""
+        entries = [('domain-c1', 'datastores', make_datastores(2), CREDS),
+                   ('domain-c1', 'networks', [{'name': 'net-1', 'id': 'network-1'}], CREDS),
+                   ('domain-c2', 'datastores', make_datastores(4), CREDS),
+                   ('domain-c3', 'datastores', None, CREDS)]
+        self.assertEqual(vsphere_redis_cache.cache_many_cluster_resources(entries), 3)
+        
+        vsphere_redis_cache._local_cache.clear()
+        cached = vsphere_redis_cache.get_cached_cluster_resources_bulk('domain-c1', ['datastores', 'networks'], CREDS)
+        self.assertEqual(cached['datastores'], make_datastores(2))
+        self.assertEqual(len(cached['networks']), 1)
+    
+    def test_writes_use_evalsha(self):
+        """Pipelined writes call the script by SHA without checking it first."""
+        vsphere_redis_cache.cache_cluster_resources('domain-c1', 'datastores', make_datastores(2), CREDS)
+        
+        with mock.patch.object(self.redis, 'script_exists') as script_exists:
+            vsphere_redis_cache.cache_cluster_resources('domain-c1', 'networks', make_datastores(2), CREDS)
+        script_exists.assert_not_called()
+        self.assertEqual(self.redis.script_exists(vsphere_redis_cache.CACHE_WRITE_SHA), [True])
+    
+    def test_flushed_script_is_sent_again(self):
+        """Writes fall back to EVAL when Redis no longer has the script."""
+        vsphere_redis_cache.cache_cluster_resources('domain-c1', 'datastores', make_datastores(2), CREDS)
+        self.redis.script_flush()
+        
+        new = make_datastores(3, prefix='new')
+        self.assertTrue(vsphere_redis_cache.cache_cluster_resources('domain-c1', 'datastores', new, CREDS))
+        self.assertEqual(self.read('domain-c1'), new)
+    
+    def test_write_keys_share_one_slot(self):
+        """The script's keys hash to one slot, as Redis Cluster requires."""
+        from redis.crc import key_slot
+        keys = [vsphere_redis_cache.get_cluster_cache_key('domain-c1', CREDS)]
+        for resource_type in vsphere_redis_cache.RESOURCE_TYPES:
+            keys.append(vsphere_redis_cache._index_key(CREDS, resource_type))
+            keys.append(vsphere_redis_cache._compressed_index_key(CREDS, resource_type))
+        self.assertEqual(len({key_slot(key.encode()) for key in keys}), 1)
+
+
+class TestLocalCache(RedisCacheTestCase):
+    """Test the in-process cache in front of Redis."""
+    
+    def get(self, cluster_id='domain-c1'):
+        """Look up datastores through the in-process cache."""
+        return vsphere_redis_cache.get_cached_cluster_resources(cluster_id, 'datastores', CREDS)
+    
+    def test_writes_replace_local_entries(self):
+        """A lookup after a write or invalidation does not see the old list."""
+        old, new = make_datastores(2, prefix='old'), make_datastores(2, prefix='new')
+        vsphere_redis_cache.cache_cluster_resources('domain-c1', 'datastores', old, CREDS)
+        self.assertEqual(self.get(), old)
+        
+        vsphere_redis_cache.cache_cluster_resources('domain-c1', 'datastores', new, CREDS)
+        self.assertEqual(self.get(), new)
+        
+        vsphere_redis_cache.invalidate_cluster_cache('domain-c1', CREDS)
+        self.assertIsNone(self.get())
+    
+    def test_write_during_lookup_is_not_undone(self):
+        """A lookup that read Redis before a write does not cache the old list."""
+        old, new = make_datastores(2, prefix='old'), make_datastores(2, prefix='new')
+        vsphere_redis_cache.cache_cluster_resources('domain-c1', 'datastores', old, CREDS)
+        read_redis = vsphere_redis_cache._get_cached_cluster_resources_from_redis
+        
+        def read_then_write(*args):
+            result = read_redis(*args)
+            vsphere_redis_cache.cache_cluster_resources('domain-c1', 'datastores', new, CREDS)
+            return result
+        
+        with mock.patch.object(vsphere_redis_cache, '_get_cached_cluster_resources_from_redis',
+                               side_effect=read_then_write):
+            self.assertEqual(self.get(), old)
+        self.assertEqual(self.get(), new)
+    
+    def test_hits_return_copies(self):
+        """Changing a returned list does not change what later lookups see."""
+        datastores = make_datastores(2)
+        vsphere_redis_cache.cache_cluster_resources('domain-c1', 'datastores', datastores, CREDS)
+        
+        first = self.get()
+        first.pop()
+        first[0]['name'] = 'changed'
+        self.assertEqual(self.get(), datastores)
+    
+    def test_json_hits_return_copies(self):
+        """Changing a returned JSON value does not change later lookups."""
+        vsphere_redis_cache.cache_json('vsphere:datacenters', [{'name': 'EBDC PROD'}])
+        vsphere_redis_cache.get_cached_json('vsphere:datacenters')[0]['name'] = 'changed'
+        self.assertEqual(vsphere_redis_cache.get_cached_json('vsphere:datacenters'),
+                         [{'name': 'EBDC PROD'}])
+        
+        # The same holds for values read from Redis into the local cache
+        vsphere_redis_cache._local_cache.clear()
+        vsphere_redis_cache.get_cached_json('vsphere:datacenters').clear()
+        self.assertEqual(vsphere_redis_cache.get_cached_json('vsphere:datacenters'),
+                         [{'name': 'EBDC PROD'}])
+    
+    def test_clear_during_lookup_is_not_undone(self):
+        """A lookup that read Redis before a clear doesn't refill the local cache."""
+        vsphere_redis_cache.cache_cluster_resources('domain-c1', 'datastores', make_datastores(2), CREDS)
+        read_redis = vsphere_redis_cache._get_cached_cluster_resources_from_redis
+        
+        def read_then_clear(*args):
+            result = read_redis(*args)
+            vsphere_redis_cache.clear_all_cache()
+            return result
+        
+        with mock.patch.object(vsphere_redis_cache, '_get_cached_cluster_resources_from_redis',
+                               side_effect=read_then_clear):
+            self.get()
+        self.assertIsNone(self.get())
+
+
+class TestCacheStats(RedisCacheTestCase):
+    """Test cache statistics derived from the index sets."""
+    
+    def stats(self):
+        """Get fresh stats for the test credentials."""
+        vsphere_redis_cache._local_cache.clear()
+        return vsphere_redis_cache.get_cache_stats(CREDS)
+    
+    def test_counts_follow_writes_and_invalidation(self):
+        """Counts track compressed and uncompressed entries."""
+        vsphere_redis_cache.cache_cluster_resources('domain-c1', 'datastores', make_datastores(2), CREDS)
+        vsphere_redis_cache.cache_cluster_resources('domain-c2', 'datastores', make_datastores(2000), CREDS)
+        vsphere_redis_cache.cache_cluster_resources('domain-c1', 'networks', [{'name': 'net-1', 'id': 'network-1'}], CREDS)
+        
+        stats = self.stats()
+        self.assertEqual(stats['total_keys'], 3)
+        self.assertEqual(stats['resource_types']['datastores'], 2)
+        self.assertEqual(stats['memory_usage']['datastores'],
+                         {'uncompressed_keys': 1, 'compressed_keys': 1})
+        self.assertLess(stats['compression_ratio']['datastores'], 1)
+        
+        # An entry changing between compressed and uncompressed is not counted twice
+        vsphere_redis_cache.cache_cluster_resources('domain-c1', 'datastores', make_datastores(2000), CREDS)
+        stats = self.stats()
+        self.assertEqual(stats['memory_usage']['datastores'],
+                         {'uncompressed_keys': 0, 'compressed_keys': 2})
+        
+        vsphere_redis_cache.invalidate_cluster_cache('domain-c1', CREDS)
+        stats = self.stats()
+        self.assertEqual(stats['total_keys'], 1)
+        self.assertEqual(stats['resource_types']['networks'], 0)
+    
+    def test_expired_entries_are_not_counted(self):
+        """Entries past their TTL drop out of the counts and the index."""
+        vsphere_redis_cache.cache_cluster_resources('domain-c1', 'datastores', make_datastores(2), CREDS)
+        vsphere_redis_cache.cache_cluster_resources('domain-c2', 'datastores', make_datastores(2000), CREDS)
+        
+        later = time.time_ns() + vsphere_redis_cache.CACHE_TTL_NS + 1_000_000
+        with mock.patch.object(vsphere_redis_cache.time, 'time_ns', return_value=later):
+            stats = self.stats()
+            self.assertEqual(stats['resource_types']['datastores'], 0)
+            self.assertEqual(stats['memory_usage']['datastores'],
+                             {'uncompressed_keys': 0, 'compressed_keys': 0})
+            
+            # The next write drops the expired members from the index sets
+            vsphere_redis_cache.cache_cluster_resources('domain-c3', 'datastores', make_datastores(2), CREDS)
+            self.assertEqual(self.stats()['resource_types']['datastores'], 1)
+        
+        self.assertEqual(self.redis.zrange(vsphere_redis_cache._index_key(CREDS, 'datastores'), 0, -1),
+                         [b'domain-c3'])
+        self.assertEqual(self.redis.zcard(vsphere_redis_cache._compressed_index_key(CREDS, 'datastores')), 0)
+    
+    def test_stats_are_reused_briefly(self):
+        """Repeated polls within the local cache TTL reuse one result."""
+        first = self.stats()
+        vsphere_redis_cache.cache_cluster_resources('domain-c1', 'datastores', make_datastores(2), CREDS)
+        self.assertEqual(vsphere_redis_cache.get_cache_stats(CREDS), first)
+    
+    def test_reused_stats_are_copies(self):
+        """Changing a returned stats dict does not change later results."""
+        self.stats()['total_keys'] = 99
+        self.assertEqual(self.stats()['total_keys'], 0)
+
+
+class TestPerfWriter(RedisCacheTestCase):
+    """Test the background writer for performance measurements."""
+    
+    def setUp(self):
+        super().setUp()
+        vsphere_redis_cache.flush_perf_metrics()
+        patch = mock.patch.object(vsphere_redis_cache, 'PERF_SAMPLE_RATE', 1)
+        patch.start()
+        self.addCleanup(patch.stop)
+        self.addCleanup(vsphere_redis_cache.flush_perf_metrics)
+    
+    def test_writer_starts_on_first_measurement(self):
+        """No writer thread runs until something is measured."""
+        self.assertIsNone(vsphere_redis_cache._perf_thread)
+        
+        vsphere_redis_cache.timeit(lambda: None)()
+        self.assertTrue(vsphere_redis_cache._perf_thread.is_alive())
+    
+    def test_flush_writes_queued_measurements(self):
+        """Flushing writes what is queued and stops the writer."""
+        timed = vsphere_redis_cache.timeit(lambda: None)
+        for _ in range(3):
+            timed()
+        thread = vsphere_redis_cache._perf_thread
+        
+        vsphere_redis_cache.flush_perf_metrics()
+        self.assertFalse(thread.is_alive())
+        self.assertIsNone(vsphere_redis_cache._perf_thread)
+        self.assertEqual(self.redis.zcard(f"{vsphere_redis_cache.CACHE_PREFIX}perf:<lambda>"), 3)
+
+
+@unittest.skipUnless(FAKEREDIS_AVAILABLE, "fakeredis[lua] not installed")
+class TestTemplateLoader(RedisCacheTestCase):
+    """Test background template loading."""
+    
+    def setUp(self):
+        super().setUp()
+        self.loader = vsphere_redis_cache.TemplateLoader(max_workers=2)
+        self.addCleanup(self.loader.shutdown)
+        
+        self.release = threading.Event()
+        self.instance = mock.Mock()
+        self.instance.connect.return_value = True
+        
+        def get_templates(cluster_obj):
+            self.release.wait(5)
+            return [{'name': f"{cluster_obj}-template", 'id': 'vm-1'}]
+        
+        self.instance.get_templates_by_cluster.side_effect = get_templates
+    
+    def wait_for_loads(self):
+        """Let queued loads finish and wait for them."""
+        self.release.set()
+        with self.loader.lock:
+            futures = list(self.loader._futures)
+        for future in futures:
+            future.result(5)
+    
+    def test_repeat_requests_coalesce(self):
+        """Requests for a cluster already queued or loading are dropped."""
+        for _ in range(3):
+            self.loader.start_loading_templates('domain-c1', 'cluster-1', self.instance, CREDS)
+        self.loader.start_loading_templates('domain-c2', 'cluster-2', self.instance, CREDS)
+        self.wait_for_loads()
+        
+        self.assertEqual(self.instance.get_templates_by_cluster.call_count, 2)
+        self.assertEqual(self.read('domain-c1', 'templates'), [{'name': 'cluster-1-template', 'id': 'vm-1'}])
+        
+        # Once finished, the cluster can be loaded again
+        self.loader.start_loading_templates('domain-c1', 'cluster-1', self.instance, CREDS)
+        self.wait_for_loads()
+        self.assertEqual(self.instance.get_templates_by_cluster.call_count, 3)
+    
+    def test_each_load_holds_its_own_session(self):
+        """Every load connects once and disconnects once, even on failure."""
+        self.instance.get_templates_by_cluster.side_effect = [[], RuntimeError("fetch failed")]
+        self.loader.start_loading_templates('domain-c1', 'cluster-1', self.instance, CREDS)
+        self.loader.start_loading_templates('domain-c2', 'cluster-2', self.instance, CREDS)
+        self.wait_for_loads()
+        
+        self.assertEqual(self.instance.connect.call_count, 2)
+        self.assertEqual(self.instance.disconnect.call_count, 2)
+    
+    def test_failed_connect_is_not_released(self):
+        """A load that could not connect does not disconnect."""
+        self.instance.connect.return_value = False
+        self.loader.start_loading_templates('domain-c1', 'cluster-1', self.instance, CREDS)
+        self.wait_for_loads()
+        
+        self.instance.get_templates_by_cluster.assert_not_called()
+        self.instance.disconnect.assert_not_called()
+
+
+if __name__ == '__main__':
+    unittest.main()
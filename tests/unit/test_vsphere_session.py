@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+"""
+vSphere Session Unit Tests
+
+This module tests the shared vSphere session kept by
+VSphereClusterResources, including:
+- Reusing one login across connect() calls
+- Reference counting between connect() and disconnect()
+- Idle logout and replacement of expired sessions
+- Retrying template reads on a fresh session
+"""
+import os
+import sys
+import time
+import logging
+import threading
+import unittest
+from unittest import mock
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+import vsphere_cluster_resources
+
+
+class TestSessionRefcount(unittest.TestCase):
+    """Test acquiring and releasing the shared vSphere session."""
+    
+    def setUp(self):
+        self.service_instance = mock.MagicMock()
+        patches = [
+            mock.patch.object(vsphere_cluster_resources.connect, 'SmartConnect',
+                              return_value=self.service_instance),
+            mock.patch.object(vsphere_cluster_resources.connect, 'Disconnect'),
+            # Keep the idle timer from firing during a test
+            mock.patch.object(vsphere_cluster_resources, 'SESSION_IDLE_TIMEOUT', 60),
+        ]
+        self.smart_connect, self.logout = patches[0].start(), patches[1].start()
+        patches[2].start()
+        for patch in patches:
+            self.addCleanup(patch.stop)
+        
+        self.resources = vsphere_cluster_resources.VSphereClusterResources(
+            server='vcenter.example.com', username='user', password='secret')
+        self.addCleanup(self.resources.close)
+    
+    def test_connect_reuses_session(self):
+        """Repeat connects share one login and count their references."""
+        self.assertTrue(self.resources.connect())
+        self.assertTrue(self.resources.connect())
+        
+        self.assertEqual(self.smart_connect.call_count, 1)
+        self.assertEqual(self.resources._session_users, 2)
+    
+    def test_concurrent_connects_log_in_once(self):
+        """Threads connecting at the same time share a single login."""
+        def slow_login(**kwargs):
+            time.sleep(0.05)
+            return mock.MagicMock()
+        
+        self.smart_connect.side_effect = slow_login
+        barrier = threading.Barrier(4)
+        results = []
+        
+        def connect():
+            barrier.wait(5)
+            results.append(self.resources.connect())
+        
+        threads = [threading.Thread(target=connect) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(5)
+        
+        self.assertEqual(results, [True] * 4)
+        self.assertEqual(self.smart_connect.call_count, 1)
+        self.assertEqual(self.resources._session_users, 4)
+        self.assertIsNotNone(self.resources.content)
+        
+        self.resources.close()
+        self.assertEqual(self.logout.call_count, 1)
+    
+    def test_idle_timer_starts_after_last_release(self):
+        """The session stays logged in until its last user releases it."""
+        self.resources.connect()
+        self.resources.connect()
+        
+        self.resources.disconnect()
+        self.assertIsNone(self.resources._idle_timer)
+        
+        self.resources.disconnect()
+        self.assertEqual(self.resources._session_users, 0)
+        self.assertIsNotNone(self.resources._idle_timer)
+        self.logout.assert_not_called()
+        
+        # Connecting again picks the session back up
+        self.resources.connect()
+        self.assertIsNone(self.resources._idle_timer)
+        self.assertEqual(self.smart_connect.call_count, 1)
+    
+    def test_unmatched_disconnect_is_reported(self):
+        """An extra disconnect() is logged and doesn't start the idle logout."""
+        self.resources.connect()
+        self.resources.disconnect()
+        self.resources._idle_timer.cancel()
+        self.resources._idle_timer = None
+        
+        with self.assertLogs(vsphere_cluster_resources.logger, level='WARNING'):
+            self.resources.disconnect()
+        self.assertEqual(self.resources._session_users, 0)
+        self.assertIsNone(self.resources._idle_timer)
+    
+    def test_idle_session_is_closed(self):
+        """An unused session is logged out when the idle timer fires."""
+        self.resources.connect()
+        self.resources.disconnect()
+        self.resources._close_if_idle()
+        
+        self.logout.assert_called_once_with(self.service_instance)
+        self.assertIsNone(self.resources.service_instance)
+    
+    def test_idle_close_skips_session_in_use(self):
+        """A session picked up again before the timer fires stays open."""
+        self.resources.connect()
+        self.resources.disconnect()
+        self.resources.connect()
+        self.resources._close_if_idle()
+        
+        self.logout.assert_not_called()
+    
+    def test_expired_session_keeps_other_references(self):
+        """Replacing an expired session keeps the references other callers hold."""
+        self.resources.connect()
+        self.resources.connect()
+        
+        expired = self.service_instance
+        self.resources._expire_session()
+        self.smart_connect.return_value = mock.MagicMock()
+        
+        self.assertTrue(self.resources.connect())
+        self.assertEqual(self.smart_connect.call_count, 2)
+        self.assertEqual(self.resources._session_users, 3)
+        
+        # The expired session is only logged out once nobody uses it
+        self.logout.assert_not_called()
+        for _ in range(3):
+            self.resources.disconnect()
+        self.logout.assert_called_once_with(expired)
+    
+    def test_unused_expired_session_is_logged_out(self):
+        """An expired session nobody holds is logged out before the new login."""
+        self.resources.connect()
+        self.resources.disconnect()
+        self.resources._expire_session()
+        self.smart_connect.return_value = mock.MagicMock()
+        
+        self.assertTrue(self.resources.connect())
+        self.logout.assert_called_once_with(self.service_instance)
+        self.assertEqual(self.resources._session_users, 1)
+    
+    def test_connect_does_not_query_server(self):
+        """Reusing a session makes no request to vCenter."""
+        self.resources.connect()
+        # Any attribute read on the content (e.g. sessionManager) would fail
+        self.resources.content = mock.NonCallableMock(spec=[])
+        
+        self.assertTrue(self.resources.connect())
+        self.assertEqual(self.smart_connect.call_count, 1)
+        self.assertEqual(self.resources._session_users, 2)
+    
+    def test_expire_ignores_replaced_session(self):
+        """A failure on an already replaced session's stub leaves the new one alone."""
+        self.resources.connect()
+        self.resources._expire_session(stub=mock.sentinel.old_stub)
+        self.assertFalse(self.resources._session_expired.is_set())
+    
+    def test_templates_retry_looks_cluster_up_again(self):
+        """After a re-login the template retry uses a cluster from the new session."""
+        self.resources.connect()
+        stale_cluster = mock.MagicMock(_moId='domain-c1', _stub=self.service_instance._stub)
+        fresh_cluster = mock.MagicMock(_moId='domain-c1')
+        self.smart_connect.return_value = mock.MagicMock()
+        
+        def retrieve(cluster_obj):
+            if cluster_obj is stale_cluster:
+                raise vsphere_cluster_resources.vim.fault.NotAuthenticated()
+            return [{'name': 'rhel9'}]
+        
+        with mock.patch.object(self.resources, '_retrieve_templates', side_effect=retrieve), \
+                mock.patch.object(self.resources, 'find_cluster_by_id',
+                                  return_value=fresh_cluster) as find_cluster:
+            templates = self.resources.get_templates_by_cluster(stale_cluster)
+        
+        self.assertEqual(templates, [{'name': 'rhel9'}])
+        find_cluster.assert_called_once_with('domain-c1')
+        self.assertEqual(self.smart_connect.call_count, 2)
+        self.assertEqual(self.resources._session_users, 1)
+    
+    def test_resource_getters_release_their_reference(self):
+        """Getters that connect internally leave the count unchanged."""
+        self.resources.connect()
+        with mock.patch.object(self.resources, 'get_datacenter_list', return_value=[]):
+            self.resources.get_cluster_resources(use_cache=False)
+        self.assertEqual(self.resources._session_users, 1)
+    
+    def test_failed_connect_takes_no_reference(self):
+        """A failed login does not count as a user."""
+        self.smart_connect.side_effect = Exception("connection refused")
+        with mock.patch.object(vsphere_cluster_resources.time, 'sleep'):
+            self.assertFalse(self.resources.connect(max_retries=0))
+        self.assertEqual(self.resources._session_users, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
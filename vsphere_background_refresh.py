@@ -10,14 +10,12 @@ updates the cache with fresh data asynchronously.
 import os
 import logging
 import threading
-import json
 from datetime import datetime
 import time
 
 # Import vSphere modules
 import vsphere_redis_cache
 import vsphere_cluster_resources
-from pyVmomi import vim
 
 # Configure logging
 logger = logging.getLogger(__name__)
@@ -43,16 +41,7 @@ def refresh_cluster_resources_background(cluster_id, cluster_name=None):
         
         try:
             # Find the cluster object
-            cluster_obj = None
-            container = instance.content.viewManager.CreateContainerView(
-                instance.content.rootFolder, [vim.ClusterComputeResource], True)
-            
-            for cluster in container.view:
-                if str(cluster._moId) == cluster_id:
-                    cluster_obj = cluster
-                    break
-            
-            container.Destroy()
+            cluster_obj = instance.find_cluster_by_id(cluster_id)
             
             if not cluster_obj:
                 logger.warning(f"Could not find cluster object for ID {cluster_id}")
@@ -65,18 +54,29 @@ def refresh_cluster_resources_background(cluster_id, cluster_name=None):
                 os.environ.get('VSPHERE_PASSWORD')
             )
             
-            # Get and cache each resource type separately
-            logger.info(f"Refreshing datastores for cluster: {cluster_name or cluster_id}")
-            datastores = instance.get_datastores_by_cluster(cluster_obj)
-            vsphere_redis_cache.cache_cluster_resources(cluster_id, 'datastores', datastores, creds_hash)
-            
-            logger.info(f"Refreshing networks for cluster: {cluster_name or cluster_id}")
-            networks = instance.get_networks_by_cluster(cluster_obj)
-            vsphere_redis_cache.cache_cluster_resources(cluster_id, 'networks', networks, creds_hash)
+            def refresh_cluster_resources():
+                fetched = {}
+                
+                # Get each resource type
+                logger.info(f"Refreshing datastores for cluster: {cluster_name or cluster_id}")
+                fetched['datastores'] = instance.get_datastores_by_cluster(cluster_obj)
+                
+                logger.info(f"Refreshing networks for cluster: {cluster_name or cluster_id}")
+                fetched['networks'] = instance.get_networks_by_cluster(cluster_obj)
+                
+                logger.info(f"Refreshing resource pools for cluster: {cluster_name or cluster_id}")
+                fetched['resource_pools'] = instance.get_resource_pools_by_cluster(cluster_obj)
+                
+                # Write all three resource types to Redis in one pipeline
+                vsphere_redis_cache.cache_many_cluster_resources([
+                    (cluster_id, resource_type, resource_list, creds_hash)
+                    for resource_type, resource_list in fetched.items()
+                ])
+                return fetched
             
-            logger.info(f"Refreshing resource pools for cluster: {cluster_name or cluster_id}")
-            resource_pools = instance.get_resource_pools_by_cluster(cluster_obj)
-            vsphere_redis_cache.cache_cluster_resources(cluster_id, 'resource_pools', resource_pools, creds_hash)
+            # Share the fetch with any request already loading this cluster
+            vsphere_redis_cache.load_or_wait(
+                ('cluster_resources', cluster_id, creds_hash), refresh_cluster_resources)
             
             # Templates are slow to load - use the template loader
             logger.info(f"Starting template refresh for cluster: {cluster_name or cluster_id}")
@@ -88,8 +88,8 @@ def refresh_cluster_resources_background(cluster_id, cluster_name=None):
             logger.info(f"Background refresh completed for cluster: {cluster_name or cluster_id} in {elapsed_time:.2f}s")
             
         finally:
-            # Don't disconnect yet - template loader will do that
-            pass
+            # The template loader holds its own session reference
+            instance.disconnect()
     except Exception as e:
         logger.exception(f"Error in background refresh for cluster {cluster_id}: {str(e)}")
 
@@ -134,13 +134,8 @@ def refresh_datacenter_clusters_background(datacenter_name):
             # Cache the clusters list
             # Build a cache key for this datacenter's clusters
             dc_clusters_key = f"vsphere:{creds_hash}:datacenter:{datacenter_name}:clusters"
-            r = vsphere_redis_cache.get_redis_connection()
-            if r:
-                try:
-                    r.set(dc_clusters_key, json.dumps(clusters), ex=vsphere_redis_cache.CACHE_TTL)
-                    logger.info(f"Cached {len(clusters)} clusters for datacenter {datacenter_name}")
-                except Exception as cache_error:
-                    logger.warning(f"Error caching clusters: {str(cache_error)}")
+            if vsphere_redis_cache.cache_json(dc_clusters_key, clusters):
+                logger.info(f"Cached {len(clusters)} clusters for datacenter {datacenter_name}")
             
             logger.info(f"Background refresh completed for datacenter: {datacenter_name} with {len(clusters)} clusters")
             
@@ -184,13 +179,8 @@ def refresh_all_datacenters_background():
             
             # Cache the datacenters list
             datacenters_key = f"vsphere:{creds_hash}:datacenters"
-            r = vsphere_redis_cache.get_redis_connection()
-            if r:
-                try:
-                    r.set(datacenters_key, json.dumps(simplified_dcs), ex=vsphere_redis_cache.CACHE_TTL)
-                    logger.info(f"Cached {len(simplified_dcs)} datacenters")
-                except Exception as cache_error:
-                    logger.warning(f"Error caching datacenters: {str(cache_error)}")
+            if vsphere_redis_cache.cache_json(datacenters_key, simplified_dcs):
+                logger.info(f"Cached {len(simplified_dcs)} datacenters")
             
             logger.info(f"Background refresh completed for datacenters with {len(datacenters)} entries")
             
@@ -15,13 +15,15 @@ import ssl
 import json
 import time
 import logging
+import operator
 from datetime import datetime
-from threading import Lock
+from threading import Lock, Thread, Event, Timer
 from typing import Dict, List, Optional, Any, Set
 
 try:
     from pyVim import connect
     from pyVmomi import vim
+    from vsphere_utils import get_datacenters, retrieve_view_properties
 except ImportError:
     logging.error("Required packages not installed. Run: pip install pyVmomi")
 
@@ -36,6 +38,16 @@ CACHE_LOCK = Lock()  # Lock for thread-safety
 # Default connection parameters
 DEFAULT_TIMEOUT = int(os.environ.get('VSPHERE_TIMEOUT', '30'))
 DEFAULT_DATACENTERS = os.environ.get('VSPHERE_DATACENTERS', '').split(',')
+SESSION_KEEPALIVE_INTERVAL = int(os.environ.get('VSPHERE_KEEPALIVE_INTERVAL', '300'))  # Seconds between session pings
+SESSION_IDLE_TIMEOUT = int(os.environ.get('VSPHERE_SESSION_IDLE_TIMEOUT', '300'))  # Seconds an unused session stays logged in
+CLUSTER_MAP_TTL = int(os.environ.get('VSPHERE_CLUSTER_MAP_TTL', '300'))  # Seconds before the cluster ID map is rebuilt
+
+_datastore_name = operator.itemgetter('name')
+
+def filter_local_datastores(datastores):
+    """Drop host-local datastores (those with "_local" in the name)."""
+    name = _datastore_name
+    return [ds for ds in datastores if "_local" not in name(ds)]
 
 class VSphereClusterResources:
     """Retrieves and organizes vSphere resources in a cluster-centric hierarchy."""
@@ -49,6 +61,26 @@ class VSphereClusterResources:
         self.service_instance = None
         self.content = None
         
+        # Clusters by ID and when the map was built, see find_cluster_by_id
+        self._clusters_by_id = None
+        self._clusters_by_id_at = 0.0
+        
+        # Keeps an idle session from timing out between uses; the event is
+        # set once the server reports the session as no longer logged in
+        self._keepalive_stop = None
+        self._session_expired = Event()
+        
+        # Callers currently using the session; it is logged out once
+        # nobody has used it for SESSION_IDLE_TIMEOUT seconds
+        self._session_lock = Lock()
+        self._connect_lock = Lock()
+        self._session_users = 0
+        self._idle_timer = None
+        
+        # Expired sessions replaced while callers were still using them;
+        # they are logged out once the last of those callers is done
+        self._retired_sessions = []
+        
         # Ensure cache directory exists
         os.makedirs(CACHE_DIR, exist_ok=True)
         
@@ -110,7 +142,44 @@ class VSphereClusterResources:
             logger.warning("Running in simulation mode with dummy credentials")
             self.content = "SIMULATION"  # Set a marker that we can check for simulation mode
             return True
+        
+        # Reuse the existing session rather than logging in again
+        if self._reuse_session():
+            return True
+        
+        # Only one thread logs in; the others wait here and then share
+        # the session it opened
+        with self._connect_lock:
+            if self._reuse_session():
+                return True
+            return self._login(connection_timeout, max_retries)
+    
+    def _reuse_session(self):
+        """
+        Take a reference to the current session unless it has expired.
+        
+        No request is made to the server here: the keepalive thread and
+        callers that hit NotAuthenticated flag an expired session, see
+        _expire_session(). An expired session is logged out if nobody is
+        using it, or retired until its last user is done otherwise.
+        References other callers hold carry over to the session that
+        replaces it.
+        """
+        with self._session_lock:
+            if self.service_instance and not self._session_expired.is_set():
+                logger.debug("Reusing existing vSphere session")
+                self._acquire_session()
+                return True
             
+            if self.service_instance:
+                if self._session_users:
+                    self._retire_session()
+                else:
+                    self._logout()
+            return False
+    
+    def _login(self, connection_timeout, max_retries):
+        """Log in to vSphere with retries (caller holds _connect_lock)."""
         # Initialize retry loop
         retries = 0
         while retries <= max_retries:
@@ -122,24 +191,17 @@ class VSphereClusterResources:
                 retry_msg = f" (retry {retries}/{max_retries})" if retries > 0 else ""
                 logger.info(f"Connecting to vSphere server: {self.server} (timeout: {connection_timeout}s){retry_msg}")
                 
-                # Set socket timeout before attempting connection
-                import socket
-                old_timeout = socket.getdefaulttimeout()
-                socket.setdefaulttimeout(connection_timeout)
+                # The timeout is set on the stub's own connections rather than
+                # the process-wide socket default, which other threads share
+                service_instance = connect.SmartConnect(
+                    host=self.server,
+                    user=self.username,
+                    pwd=self.password,
+                    sslContext=context,
+                    httpConnectionTimeout=connection_timeout
+                )
                 
-                try:
-                    # Attempt connection with timeout
-                    self.service_instance = connect.SmartConnect(
-                        host=self.server,
-                        user=self.username,
-                        pwd=self.password,
-                        sslContext=context
-                    )
-                finally:
-                    # Restore original timeout
-                    socket.setdefaulttimeout(old_timeout)
-                
-                if not self.service_instance:
+                if not service_instance:
                     logger.error("Failed to connect to vSphere server (null service instance)")
                     if retries < max_retries:
                         retries += 1
@@ -147,7 +209,17 @@ class VSphereClusterResources:
                     return False
                 
                 # Retrieve content
-                self.content = self.service_instance.RetrieveContent()
+                content = service_instance.RetrieveContent()
+                
+                # Publish the session and its content together, so other
+                # threads never see one without the other
+                with self._session_lock:
+                    self.service_instance = service_instance
+                    self.content = content
+                    self._clusters_by_id = None
+                    self._session_expired = Event()
+                    self._acquire_session()
+                    self._start_keepalive()
                 logger.info("Successfully connected to vSphere server")
                 return True
                 
@@ -181,12 +253,168 @@ class VSphereClusterResources:
         # If we get here, all retries failed
         return False
     
+    def _expire_session(self, stub=None):
+        """
+        Flag the session as no longer logged in so the next connect() replaces it.
+        
+        Args:
+            stub: The SOAP stub the failed call was made on; a failure on a
+                session that has already been replaced is ignored
+        """
+        with self._session_lock:
+            if not self.service_instance:
+                return
+            if stub is not None and getattr(self.service_instance, '_stub', None) is not stub:
+                return
+            self._session_expired.set()
+    
+    def _start_keepalive(self):
+        """Start pinging the server periodically so the session doesn't expire while idle (caller holds _session_lock)."""
+        if self._keepalive_stop:
+            self._keepalive_stop.set()
+        
+        stop = self._keepalive_stop = Event()
+        expired = self._session_expired
+        service_instance = self.service_instance
+        
+        def keepalive():
+            while not stop.wait(SESSION_KEEPALIVE_INTERVAL):
+                try:
+                    service_instance.CurrentTime()
+                except vim.fault.NotAuthenticated:
+                    logger.debug("vSphere session expired, it will be renewed on next connect")
+                    expired.set()
+                    return
+                except Exception as e:
+                    # A network hiccup doesn't end the session; try again
+                    # on the next interval
+                    logger.debug(f"vSphere keepalive failed: {str(e)}")
+        
+        Thread(target=keepalive, daemon=True, name='vsphere-keepalive').start()
+    
+    def _acquire_session(self):
+        """Record a caller using the session and cancel any pending idle logout (caller holds _session_lock)."""
+        self._session_users += 1
+        if self._idle_timer:
+            self._idle_timer.cancel()
+            self._idle_timer = None
+    
     def disconnect(self):
-        """Disconnect from vSphere server."""
+        """
+        Release the vSphere session taken by connect().
+        
+        Every successful connect() must be paired with exactly one
+        disconnect(). The session stays logged in so back-to-back calls skip the TLS
+        handshake and login; it is closed once no caller has used it for
+        SESSION_IDLE_TIMEOUT seconds. Use close() to log out immediately.
+        """
+        with self._session_lock:
+            if not self._session_users:
+                logger.warning("vSphere disconnect() called without a matching connect()")
+                return
+            
+            self._session_users -= 1
+            if self._session_users:
+                return
+            
+            self._logout_retired()
+            if not self.service_instance:
+                return
+            
+            if self._idle_timer:
+                self._idle_timer.cancel()
+            self._idle_timer = Timer(SESSION_IDLE_TIMEOUT, self._close_if_idle)
+            self._idle_timer.daemon = True
+            self._idle_timer.start()
+    
+    def _close_if_idle(self):
+        """Log out if the session was not picked up again while the timer ran."""
+        with self._session_lock:
+            if self._session_users:
+                return
+            self._idle_timer = None
+            logger.debug("Closing idle vSphere session")
+            self._logout()
+    
+    def close(self):
+        """Log out of the vSphere server immediately."""
+        with self._session_lock:
+            self._session_users = 0
+            if self._idle_timer:
+                self._idle_timer.cancel()
+                self._idle_timer = None
+            self._logout_retired()
+            self._logout()
+    
+    def _retire_session(self):
+        """
+        Set an expired session aside while callers still use it (caller holds _session_lock).
+        
+        Its content stays published until the replacement login replaces it,
+        so callers already working with it don't find it gone.
+        """
+        if self._keepalive_stop:
+            self._keepalive_stop.set()
+            self._keepalive_stop = None
+        self._retired_sessions.append(self.service_instance)
+        self.service_instance = None
+        self._clusters_by_id = None
+    
+    def _logout_retired(self):
+        """Log out sessions retired while they were in use (caller holds _session_lock)."""
+        for service_instance in self._retired_sessions:
+            try:
+                connect.Disconnect(service_instance)
+            except Exception as e:
+                logger.debug(f"Error logging out of vSphere: {str(e)}")
+        self._retired_sessions = []
+        if not self.service_instance:
+            self.content = None
+    
+    def _logout(self):
+        """End the session and drop per-connection state (caller holds _session_lock)."""
+        if self._keepalive_stop:
+            self._keepalive_stop.set()
+            self._keepalive_stop = None
         if self.service_instance:
-            connect.Disconnect(self.service_instance)
+            try:
+                connect.Disconnect(self.service_instance)
+            except Exception as e:
+                logger.debug(f"Error logging out of vSphere: {str(e)}")
             self.service_instance = None
             self.content = None
+            self._clusters_by_id = None
+    
+    def find_cluster_by_id(self, cluster_id):
+        """
+        Find a cluster managed object by its ID.
+        
+        All clusters are read from one container view and reused for
+        CLUSTER_MAP_TTL seconds, so repeated lookups (e.g. one per cluster
+        during a sync) don't each create and walk a server-side view. The map
+        is rebuilt early when an ID is missing, so clusters added in vCenter
+        since it was built are still found.
+        
+        Returns:
+            vim.ClusterComputeResource or None if not found
+        """
+        if not self.content:
+            return None
+        
+        cluster_id = str(cluster_id)
+        clusters_by_id = self._clusters_by_id
+        if (clusters_by_id is None or cluster_id not in clusters_by_id
+                or time.monotonic() - self._clusters_by_id_at > CLUSTER_MAP_TTL):
+            container = self.content.viewManager.CreateContainerView(
+                self.content.rootFolder, [vim.ClusterComputeResource], True)
+            try:
+                clusters_by_id = {str(cluster._moId): cluster for cluster in container.view}
+            finally:
+                container.Destroy()
+            self._clusters_by_id = clusters_by_id
+            self._clusters_by_id_at = time.monotonic()
+        
+        return clusters_by_id.get(cluster_id)
     
     def _get_cache_path(self, resource_type):
         """Get the cache file path for a resource type."""
@@ -243,18 +471,7 @@ class VSphereClusterResources:
             return [SimulatedDC(name) for name in datacenter_names]
             
         # Normal mode - get real datacenters
-        datacenter_list = []
-        container = self.content.viewManager.CreateContainerView(
-            self.content.rootFolder, [vim.Datacenter], True)
-        
-        for dc in container.view:
-            # Skip if not in the filter list (if provided)
-            if filter_names and dc.name not in filter_names:
-                continue
-            datacenter_list.append(dc)
-        
-        container.Destroy()
-        return datacenter_list
+        return get_datacenters(self.content, filter_names)
     
     def get_clusters(self, datacenter=None):
         """Get all clusters from a datacenter or all datacenters."""
@@ -324,18 +541,23 @@ class VSphereClusterResources:
         container = self.content.viewManager.CreateContainerView(
             folder, [vim.ClusterComputeResource], True)
         
-        result = []
-        for cluster in container.view:
-            result.append({
-                'name': cluster.name,
-                'id': str(cluster._moId),
-                'type': 'Cluster',
-                'datacenter': datacenter.name if datacenter else None,
-                'host_count': len(cluster.host) if hasattr(cluster, 'host') else 0
-            })
-        
-        container.Destroy()
-        return result
+        dc_name = datacenter.name if datacenter else None
+        
+        try:
+            # Names and host lists for all clusters in one call instead of
+            # several round-trips per cluster
+            cluster_props = retrieve_view_properties(
+                self.content, container, vim.ClusterComputeResource, ['name', 'host'])
+        finally:
+            container.Destroy()
+        
+        return [{
+            'name': props.get('name'),
+            'id': str(cluster._moId),
+            'type': 'Cluster',
+            'datacenter': dc_name,
+            'host_count': len(props.get('host') or [])
+        } for cluster, props in cluster_props]
     
     def get_resource_pools_by_cluster(self, cluster_obj):
         """Get resource pools for a specific cluster, returning just one primary pool."""
@@ -360,12 +582,19 @@ class VSphereClusterResources:
         if not self.content or not cluster_obj:
             return []
             
+        # Read cluster properties once; each attribute access is a round-trip
+        cluster_hosts = cluster_obj.host
+        host_total = len(cluster_hosts)
+        cluster_id = str(cluster_obj._moId)
+        cluster_name = cluster_obj.name
+        
         # Get all hosts in the cluster
         host_datastores = {}
         shared_datastores = set()
         
         # First pass: collect all datastores and track which hosts can access them
-        for host in cluster_obj.host:
+        for host in cluster_hosts:
+            host_id = str(host._moId)
             for ds in host.datastore:
                 ds_id = str(ds._moId)
                 if ds_id not in host_datastores:
@@ -375,10 +604,10 @@ class VSphereClusterResources:
                         'hosts': set()
                     }
                 host_datastores[ds_id]['host_count'] += 1
-                host_datastores[ds_id]['hosts'].add(str(host._moId))
+                host_datastores[ds_id]['hosts'].add(host_id)
                 
                 # If a datastore is accessible by all hosts in the cluster, it's shared
-                if host_datastores[ds_id]['host_count'] == len(cluster_obj.host):
+                if host_datastores[ds_id]['host_count'] == host_total:
                     shared_datastores.add(ds_id)
         
         result = []
@@ -390,23 +619,22 @@ class VSphereClusterResources:
             # Skip individual host datastores (not shared)
             if ds_id not in shared_datastores and not getattr(ds, 'storageIORMConfiguration', None):
                 continue
-                
+            
+            # The summary carries the name and capacity, so fetch it once
+            summary = ds.summary
+            
             # Get datastore information
             info = {
-                'name': ds.name,
+                'name': summary.name,
                 'id': ds_id,
                 'type': 'Datastore',
-                'cluster_id': str(cluster_obj._moId),
-                'cluster_name': cluster_obj.name,
-                'shared_across_cluster': ds_id in shared_datastores
+                'cluster_id': cluster_id,
+                'cluster_name': cluster_name,
+                'shared_across_cluster': ds_id in shared_datastores,
+                'capacity': summary.capacity or 0,
+                'free_space': summary.freeSpace or 0
             }
-            
-            # Add capacity information if available
-            if hasattr(ds, 'summary'):
-                summary = ds.summary
-                info['capacity'] = summary.capacity if hasattr(summary, 'capacity') else 0
-                info['free_space'] = summary.freeSpace if hasattr(summary, 'freeSpace') else 0
-                info['free_gb'] = round(info['free_space'] / (1024**3), 2)
+            info['free_gb'] = round(info['free_space'] / (1024**3), 2)
             
             result.append(info)
         
@@ -417,12 +645,19 @@ class VSphereClusterResources:
         if not self.content or not cluster_obj:
             return []
             
+        # Read cluster properties once; each attribute access is a round-trip
+        cluster_hosts = cluster_obj.host
+        host_total = len(cluster_hosts)
+        cluster_id = str(cluster_obj._moId)
+        cluster_name = cluster_obj.name
+        
         # Get all hosts in the cluster
         host_networks = {}
         shared_networks = set()
         
         # First pass: collect all networks and track which hosts can access them
-        for host in cluster_obj.host:
+        for host in cluster_hosts:
+            host_id = str(host._moId)
             for network in host.network:
                 net_id = str(network._moId)
                 if net_id not in host_networks:
@@ -432,10 +667,10 @@ class VSphereClusterResources:
                         'hosts': set()
                     }
                 host_networks[net_id]['host_count'] += 1
-                host_networks[net_id]['hosts'].add(str(host._moId))
+                host_networks[net_id]['hosts'].add(host_id)
                 
                 # If a network is accessible by all hosts in the cluster, it's shared
-                if host_networks[net_id]['host_count'] == len(cluster_obj.host):
+                if host_networks[net_id]['host_count'] == host_total:
                     shared_networks.add(net_id)
         
         result = []
@@ -452,8 +687,8 @@ class VSphereClusterResources:
                 'name': network.name,
                 'id': net_id,
                 'type': 'Network',
-                'cluster_id': str(cluster_obj._moId),
-                'cluster_name': cluster_obj.name,
+                'cluster_id': cluster_id,
+                'cluster_name': cluster_name,
                 'is_dvs': isinstance(network, vim.DistributedVirtualPortgroup)
             }
             
@@ -503,29 +738,38 @@ class VSphereClusterResources:
         # Normal mode - get real hosts
         result = []
         
+        cluster_id = str(cluster_obj._moId)
+        cluster_name = cluster_obj.name
+        
         # Process each host in the cluster
         for host in cluster_obj.host:
+            # Fetch each data object once and read its fields locally
+            runtime = host.runtime
+            
             # Skip hosts not in 'connected' state or in maintenance mode
-            if host.runtime.connectionState != 'connected' or host.runtime.inMaintenanceMode:
+            if runtime.connectionState != 'connected' or runtime.inMaintenanceMode:
                 continue
+            
+            summary = host.summary
+            memory_usage = summary.quickStats.overallMemoryUsage
                 
             # Calculate memory usage
-            total_memory = host.hardware.memorySize / (1024 * 1024)  # Convert to MB
-            used_memory = (total_memory - host.summary.quickStats.overallMemoryUsage)
+            total_memory = summary.hardware.memorySize / (1024 * 1024)  # Convert to MB
+            used_memory = (total_memory - memory_usage)
             
             # Create host info
             host_info = {
-                'name': host.name,
+                'name': summary.config.name,
                 'id': str(host._moId),
                 'type': 'HostSystem',
-                'cluster_id': str(cluster_obj._moId),
-                'cluster_name': cluster_obj.name,
-                'connection_state': host.runtime.connectionState,
-                'maintenance_mode': host.runtime.inMaintenanceMode,
+                'cluster_id': cluster_id,
+                'cluster_name': cluster_name,
+                'connection_state': runtime.connectionState,
+                'maintenance_mode': runtime.inMaintenanceMode,
                 'total_memory_mb': total_memory,
                 'used_memory_mb': used_memory,
-                'free_memory_mb': host.summary.quickStats.overallMemoryUsage,
-                'percent_memory_free': round((host.summary.quickStats.overallMemoryUsage / total_memory) * 100, 2) if total_memory > 0 else 0
+                'free_memory_mb': memory_usage,
+                'percent_memory_free': round((memory_usage / total_memory) * 100, 2) if total_memory > 0 else 0
             }
             
             result.append(host_info)
@@ -535,92 +779,36 @@ class VSphereClusterResources:
         return result
     
     def get_templates_by_cluster(self, cluster_obj):
-        """Get VM templates compatible with a specific cluster with strict timeout."""
+        """
+        Get VM templates compatible with a specific cluster.
+        
+        Runs concurrently on the template and sync pools, so it relies on the
+        per-connection timeout set in connect() rather than changing the
+        process-wide socket default.
+        """
         if not self.content or not cluster_obj:
             return []
-            
-        # Set a short timeout for template operations to prevent worker hangs
-        import socket
-        old_timeout = socket.getdefaulttimeout()
-        socket.setdefaulttimeout(10)  # 10 seconds timeout for template operations
         
         try:
-            # Get datacenter of this cluster
-            container = self.content.viewManager.CreateContainerView(
-                self.content.rootFolder, [vim.Datacenter], True)
-            
-            datacenter = None
-            for dc in container.view:
-                # Check if this cluster is in this datacenter
-                dc_clusters = self.content.viewManager.CreateContainerView(
-                    dc.hostFolder, [vim.ClusterComputeResource], True)
-                
-                for c in dc_clusters.view:
-                    if str(c._moId) == str(cluster_obj._moId):
-                        datacenter = dc
-                        break
-                
-                dc_clusters.Destroy()
-                if datacenter:
-                    break
-            
-            container.Destroy()
-            
-            if not datacenter:
-                return []
-        
-            # Get all VM templates in the datacenter
-            container = self.content.viewManager.CreateContainerView(
-                datacenter.vmFolder, [vim.VirtualMachine], True)
-            
-            # Limit the number of templates to process to avoid timeouts
-            MAX_TEMPLATES = 50
-            result = []
-            template_count = 0
-            
-            try:
-                for vm in container.view:
-                    try:
-                        # Check if vm.config is accessible and if it's a template
-                        # This is a common point of failure with timeouts
-                        if hasattr(vm, 'config') and vm.config and vm.config.template:
-                            template_info = {
-                                'name': vm.name,
-                                'id': str(vm._moId),
-                                'type': 'VirtualMachine',
-                                'cluster_id': str(cluster_obj._moId),
-                                'cluster_name': cluster_obj.name,
-                                'is_template': True,
-                                'guest_id': vm.config.guestId if vm.config and hasattr(vm.config, 'guestId') else None,
-                                'guest_fullname': vm.config.guestFullName if vm.config and hasattr(vm.config, 'guestFullName') else None
-                            }
-                            result.append(template_info)
-                            template_count += 1
-                            
-                            # Limit the number of templates to avoid timeouts
-                            if template_count >= MAX_TEMPLATES:
-                                logger.warning(f"Limiting template retrieval to {MAX_TEMPLATES} templates to avoid timeouts")
-                                break
-                    except Exception as vm_error:
-                        # Log errors but continue processing other VMs
-                        logger.error(f"Error processing VM {getattr(vm, 'name', 'unknown')}: {str(vm_error)}")
-                        continue
-            finally:
-                try:
-                    container.Destroy()
-                except Exception:
-                    pass
-            
-            return result
+            return self._retrieve_templates(cluster_obj)
         except vim.fault.NotAuthenticated:
             logger.error("Session not authenticated, attempting to reconnect")
+            self._expire_session(getattr(cluster_obj, '_stub', None))
             # Attempt to reconnect and try again
             try:
-                self.disconnect()
+                # connect() replaces the expired session; the extra reference
+                # it takes is released once the retry is done
                 if self.connect(timeout=30):
                     logger.info("Successfully reconnected after session expiration")
-                    # Recursive call with new connection
-                    return self.get_templates_by_cluster(cluster_obj)
+                    try:
+                        # The cluster object is bound to the expired session,
+                        # so look it up again on the new one
+                        cluster_obj = self.find_cluster_by_id(cluster_obj._moId)
+                        if not cluster_obj:
+                            return []
+                        return self._retrieve_templates(cluster_obj)
+                    finally:
+                        self.disconnect()
                 else:
                     logger.error("Reconnection attempt failed")
                     return []  # Return empty list on failure
@@ -631,9 +819,60 @@ class VSphereClusterResources:
             logger.error(f"Error retrieving templates: {str(e)}")
             # Return empty list instead of fallback template
             return []
+    
+    def _retrieve_templates(self, cluster_obj):
+        """Read the templates in the cluster's datacenter, see get_templates_by_cluster()."""
+        # Walk up from the cluster to its datacenter rather than listing
+        # the clusters of every datacenter
+        datacenter = cluster_obj.parent
+        while datacenter is not None and not isinstance(datacenter, vim.Datacenter):
+            datacenter = datacenter.parent
+        
+        if not datacenter:
+            return []
+    
+        # Get all VM templates in the datacenter
+        container = self.content.viewManager.CreateContainerView(
+            datacenter.vmFolder, [vim.VirtualMachine], True)
+        
+        # Limit the number of templates to process to avoid timeouts
+        MAX_TEMPLATES = 50
+        result = []
+        
+        try:
+            # Fetch only the fields we need for every VM in one paged
+            # PropertyCollector call rather than walking vm.config per VM
+            vm_props = retrieve_view_properties(
+                self.content, container, vim.VirtualMachine,
+                ['name', 'config.template', 'config.guestId', 'config.guestFullName'])
+            
+            for vm, props in vm_props:
+                # Skip regular VMs (and VMs whose config is inaccessible)
+                if not props.get('config.template'):
+                    continue
+                
+                result.append({
+                    'name': props.get('name'),
+                    'id': str(vm._moId),
+                    'type': 'VirtualMachine',
+                    'cluster_id': str(cluster_obj._moId),
+                    'cluster_name': cluster_obj.name,
+                    'is_template': True,
+                    'guest_id': props.get('config.guestId'),
+                    'guest_fullname': props.get('config.guestFullName')
+                })
+                
+                # Limit the number of templates to avoid timeouts
+                if len(result) >= MAX_TEMPLATES:
+                    logger.warning(f"Limiting template retrieval to {MAX_TEMPLATES} templates to avoid timeouts")
+                    break
         finally:
-            # Restore the original timeout
-            socket.setdefaulttimeout(old_timeout)
+            try:
+                container.Destroy()
+            except Exception:
+                pass
+        
+        return result
     
     def get_cluster_resources(self, use_cache=True, force_refresh=False, target_datacenters=None):
         """
@@ -669,8 +908,8 @@ class VSphereClusterResources:
                 logger.info("Using cached vSphere cluster resources")
                 return cached_resources
         
-        # Connect to vSphere if not already connected
-        if not self.content and not self.connect():
+        # Connect to vSphere, reusing the shared session if there is one
+        if not self.connect():
             logger.error("Could not connect to vSphere")
             return {resource_type: [] for resource_type in resource_types}
         
@@ -730,8 +969,8 @@ class VSphereClusterResources:
                 logger.info(f"Using cached resources for cluster {cluster_id}")
                 return cached_data
         
-        # Connect to vSphere if not already connected
-        if not self.content and not self.connect():
+        # Connect to vSphere, reusing the shared session if there is one
+        if not self.connect():
             logger.error("Could not connect to vSphere")
             return {
                 'resource_pools': [],
@@ -1055,10 +1294,7 @@ def get_ebdc_resources(force_refresh=False):
         # Filter out local datastores (containing "_local" in name)
         if 'datastores' in resources:
             original_count = len(resources['datastores'])
-            resources['datastores'] = [
-                ds for ds in resources['datastores'] 
-                if "_local" not in ds['name']
-            ]
+            resources['datastores'] = filter_local_datastores(resources['datastores'])
             filtered_count = len(resources['datastores'])
             logger.info(f"Filtered datastores for {cluster_name}: {original_count} → {filtered_count} (removed {original_count - filtered_count} local datastores)")
         
@@ -16,22 +16,23 @@ techniques to reduce memory usage and improve performance.
 """
 import os
 import ssl
-import json
 import time
 import logging
 import threading
 import queue
 import gc
 import weakref
+import concurrent.futures
 from datetime import datetime, timedelta
 from threading import Lock, Thread
 from typing import Dict, List, Optional, Set, Any
 
-# Import the pyVmomi module
+# Import orjson for fast reads and writes of the hierarchy cache file
 try:
-    from pyVmomi import vim
+    import orjson
 except ImportError:
-    logging.error("Required pyVmomi package not installed. Run: pip install pyVmomi")
+    logging.error("Required orjson package not installed. Run: pip install orjson")
+    raise
 
 # Import the existing loaders
 import vsphere_optimized_loader
@@ -65,6 +66,15 @@ LAZY_LOADING_ENABLED = os.environ.get('VSPHERE_LAZY_LOADING', 'true').lower() ==
 PAGINATION_SIZE = int(os.environ.get('VSPHERE_PAGINATION_SIZE', '50'))
 DATA_PRUNING_ENABLED = os.environ.get('VSPHERE_DATA_PRUNING', 'true').lower() == 'true'
 EXPLICIT_GC = os.environ.get('VSPHERE_EXPLICIT_GC', 'true').lower() == 'true'
+SYNC_FETCH_WORKERS = int(os.environ.get('VSPHERE_SYNC_FETCH_WORKERS', '4'))  # Concurrent resource fetches per cluster sync
+
+# VSphereClusterResources method fetching each resource type during a sync
+SYNC_FETCHERS = {
+    'datastores': 'get_datastores_by_cluster',
+    'networks': 'get_networks_by_cluster',
+    'templates': 'get_templates_by_cluster',
+    'resource_pools': 'get_resource_pools_by_cluster'
+}
 
 # Memory profiling top results to keep
 MEMORY_TOP_STATS = int(os.environ.get('VSPHERE_MEMORY_TOP_STATS', '25'))
@@ -339,6 +349,20 @@ class VSphereHierarchicalLoader:
         self.lock = threading.RLock()
         self.worker_threads = []
         self.shutdown_event = threading.Event()
+        # Wakes the sync worker early, for a requested sync or shutdown
+        self._sync_wake = threading.Event()
+        self._sync_requested = False
+        # Monotonic time of the last completed sync, for the interval check
+        # (status['last_sync'] keeps the ISO string for reporting)
+        self._last_sync_time = None
+        # Runs the per-cluster resource fetches; kept for the loader's lifetime
+        # so each cluster sync doesn't start and stop its own threads
+        self._sync_pool = concurrent.futures.ThreadPoolExecutor(
+            max_workers=SYNC_FETCH_WORKERS, thread_name_prefix='sync-fetch')
+        # Each fetch worker's own vSphere session (pyVmomi stubs are not
+        # safe to share between threads), kept between syncs
+        self._fetch_sessions = threading.local()
+        self._fetch_instances = []
         
         # Event queue for callbacks
         self.event_queue = queue.Queue()
@@ -449,25 +473,29 @@ class VSphereHierarchicalLoader:
     
     def _add_event(self, event_type, data=None):
         """Add an event to the queue."""
+        # Nobody to deliver to; skip building and queueing the event
+        if not self.event_listeners:
+            return
+        
         event = ResourceFetchEvent(event_type, data)
         self.event_queue.put(event)
     
     def _is_valid_json_file(self, file_path):
         """Validate if a file contains valid JSON data."""
         try:
-            with open(file_path, 'r') as f:
+            with open(file_path, 'rb') as f:
                 # Only read a small portion first to validate structure
                 start_content = f.read(1024)
-                if not start_content.strip().startswith('{'):
+                if not start_content.strip().startswith(b'{'):
                     return False
                 
                 # Reset file pointer
                 f.seek(0)
                 
                 # Try to parse JSON
-                json.load(f)
+                orjson.loads(f.read())
             return True
-        except json.JSONDecodeError as e:
+        except orjson.JSONDecodeError as e:
             logger.error(f"Invalid JSON in cache file: {str(e)}")
             return False
         except Exception as e:
@@ -503,10 +531,10 @@ class VSphereHierarchicalLoader:
                 return False
             
             # Load cache data
-            with open(HIERARCHY_CACHE_FILE, 'r') as f:
+            with open(HIERARCHY_CACHE_FILE, 'rb') as f:
                 try:
-                    cached_data = json.load(f)
-                except json.JSONDecodeError as json_err:
+                    cached_data = orjson.loads(f.read())
+                except orjson.JSONDecodeError as json_err:
                     # This shouldn't happen since we already validated the JSON,
                     # but handle it just in case
                     logger.error(f"JSON decode error when loading cache: {str(json_err)}")
@@ -633,8 +661,8 @@ class VSphereHierarchicalLoader:
             # First write to a temporary file, then rename to avoid partial writes
             temp_file = f"{HIERARCHY_CACHE_FILE}.tmp"
             with CACHE_LOCK:
-                with open(temp_file, 'w') as f:
-                    json.dump(cache_data, f, indent=2)
+                with open(temp_file, 'wb') as f:
+                    f.write(orjson.dumps(cache_data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
                 
                 # Atomic rename to final location
                 import shutil
@@ -798,17 +826,25 @@ class VSphereHierarchicalLoader:
                 target_datacenters=[datacenter_name]
             )
             
-            # Filter to only clusters in this datacenter
+            # Group clusters by datacenter in one pass. The (possibly cached)
+            # list can hold complete cluster lists for other datacenters too;
+            # indexing them now serves those datacenters from clusters_by_dc
+            # instead of re-reading and re-filtering the list later.
             # Make sure we're only processing dictionaries (guard against string values)
-            dc_clusters = []
+            clusters_by_dc = {}
             for c in clusters:
-                if isinstance(c, dict) and c.get('datacenter') == datacenter_name:
-                    dc_clusters.append(c)
+                if isinstance(c, dict):
+                    clusters_by_dc.setdefault(c.get('datacenter'), []).append(c)
                 elif isinstance(c, str):
                     logger.warning(f"Unexpected string value in clusters data: {c}")
+            dc_clusters = clusters_by_dc.get(datacenter_name, [])
             
             # Update state
             with self.lock:
+                for dc_name, other_clusters in clusters_by_dc.items():
+                    if dc_name and dc_name not in self.status['loaded_clusters_for']:
+                        self.clusters_by_dc[dc_name] = other_clusters
+                        self.status['loaded_clusters_for'].add(dc_name)
                 self.clusters_by_dc[datacenter_name] = dc_clusters
                 self.status['loading_clusters'] = False
                 self.status['loaded_clusters_for'].add(datacenter_name)
@@ -878,10 +914,10 @@ class VSphereHierarchicalLoader:
             redis_cached_resources = {}
             
             # Load essential resources (excluding templates) from Redis cache
-            for res_type in ['datastores', 'networks', 'resource_pools']:
-                cached_res = vsphere_redis_cache.get_cached_cluster_resources(
-                    cluster_id, res_type, creds_hash
-                )
+            cached_by_type = vsphere_redis_cache.get_cached_cluster_resources_bulk(
+                cluster_id, ['datastores', 'networks', 'resource_pools'], creds_hash
+            )
+            for res_type, cached_res in cached_by_type.items():
                 if cached_res:
                     redis_cached_resources[res_type] = cached_res
                     logger.debug(f"Redis cache hit for {res_type} in cluster {cluster_id}")
@@ -921,16 +957,7 @@ class VSphereHierarchicalLoader:
                 if instance.connect():
                     try:
                         # Find the cluster object
-                        cluster_obj = None
-                        container = instance.content.viewManager.CreateContainerView(
-                            instance.content.rootFolder, [vim.ClusterComputeResource], True)
-                        
-                        for cluster in container.view:
-                            if str(cluster._moId) == cluster_id:
-                                cluster_obj = cluster
-                                break
-                        
-                        container.Destroy()
+                        cluster_obj = instance.find_cluster_by_id(cluster_id)
                         
                         if cluster_obj:
                             # Launch template loading in background
@@ -938,8 +965,8 @@ class VSphereHierarchicalLoader:
                                 cluster_id, cluster_obj, instance, creds_hash
                             )
                     finally:
-                        # Don't disconnect yet - template loader will do that
-                        pass
+                        # The template loader holds its own session reference
+                        instance.disconnect()
                 
                 # Emit completed event
                 self._add_event('loading_resources_completed', {
@@ -997,16 +1024,7 @@ class VSphereHierarchicalLoader:
             if instance.connect():
                 try:
                     # Find the cluster object
-                    cluster_obj = None
-                    container = instance.content.viewManager.CreateContainerView(
-                        instance.content.rootFolder, [vim.ClusterComputeResource], True)
-                    
-                    for cluster in container.view:
-                        if str(cluster._moId) == cluster_id:
-                            cluster_obj = cluster
-                            break
-                    
-                    container.Destroy()
+                    cluster_obj = instance.find_cluster_by_id(cluster_id)
                     
                     if cluster_obj:
                         # Get critical resources first (datastores, networks, resource pools)
@@ -1031,29 +1049,31 @@ class VSphereHierarchicalLoader:
                                 }
                             ]
                         
-                        # Get datastores
-                        logger.info(f"Retrieving datastores for cluster: {cluster_name or cluster_id}")
-                        resources['datastores'] = instance.get_datastores_by_cluster(cluster_obj)
-                        # Cache in Redis
-                        vsphere_redis_cache.cache_cluster_resources(
-                            cluster_id, 'datastores', resources['datastores'], creds_hash
-                        )
-                        
-                        # Get networks
-                        logger.info(f"Retrieving networks for cluster: {cluster_name or cluster_id}")
-                        resources['networks'] = instance.get_networks_by_cluster(cluster_obj)
-                        # Cache in Redis
-                        vsphere_redis_cache.cache_cluster_resources(
-                            cluster_id, 'networks', resources['networks'], creds_hash
-                        )
+                        def fetch_cluster_resources():
+                            fetched = {}
+                            
+                            # Get datastores
+                            logger.info(f"Retrieving datastores for cluster: {cluster_name or cluster_id}")
+                            fetched['datastores'] = instance.get_datastores_by_cluster(cluster_obj)
+                            
+                            # Get networks
+                            logger.info(f"Retrieving networks for cluster: {cluster_name or cluster_id}")
+                            fetched['networks'] = instance.get_networks_by_cluster(cluster_obj)
+                            
+                            # Get resource pools
+                            logger.info(f"Retrieving resource pools for cluster: {cluster_name or cluster_id}")
+                            fetched['resource_pools'] = instance.get_resource_pools_by_cluster(cluster_obj)
+                            
+                            # Cache all three in Redis with a single pipelined write
+                            vsphere_redis_cache.cache_many_cluster_resources([
+                                (cluster_id, resource_type, resource_list, creds_hash)
+                                for resource_type, resource_list in fetched.items()
+                            ])
+                            return fetched
                         
-                        # Get resource pools
-                        logger.info(f"Retrieving resource pools for cluster: {cluster_name or cluster_id}")
-                        resources['resource_pools'] = instance.get_resource_pools_by_cluster(cluster_obj)
-                        # Cache in Redis
-                        vsphere_redis_cache.cache_cluster_resources(
-                            cluster_id, 'resource_pools', resources['resource_pools'], creds_hash
-                        )
+                        # Concurrent misses for the same cluster share one vSphere fetch
+                        resources.update(vsphere_redis_cache.load_or_wait(
+                            ('cluster_resources', cluster_id, creds_hash), fetch_cluster_resources))
                         
                         # Launch template loading in background
                         vsphere_redis_cache.template_loader.start_loading_templates(
@@ -1063,15 +1083,12 @@ class VSphereHierarchicalLoader:
                         # Filter out local datastores (containing "_local" in name)
                         if 'datastores' in resources:
                             original_count = len(resources['datastores'])
-                            resources['datastores'] = [
-                                ds for ds in resources['datastores'] 
-                                if "_local" not in ds['name']
-                            ]
+                            resources['datastores'] = vsphere_cluster_resources.filter_local_datastores(resources['datastores'])
                             filtered_count = len(resources['datastores'])
                             logger.info(f"Filtered datastores for cluster {resources.get('cluster_name', 'Unknown')}: {original_count} → {filtered_count}")
                 finally:
-                    # Don't disconnect yet - template loader will do that
-                    pass
+                    # The template loader holds its own session reference
+                    instance.disconnect()
             else:
                 # Use cached data or empty lists if connection fails
                 resources = vsphere_cluster_resources.get_resources_for_cluster(
@@ -1313,16 +1330,7 @@ class VSphereHierarchicalLoader:
                                 # Get only critical quick resources - skip templates (high timeout risk)
                                 try:
                                     # Find the cluster object with timeout protection
-                                    cluster_obj = None
-                                    container = instance.content.viewManager.CreateContainerView(
-                                        instance.content.rootFolder, [vim.ClusterComputeResource], True)
-                                    
-                                    for cluster in container.view:
-                                        if str(cluster._moId) == cluster_id:
-                                            cluster_obj = cluster
-                                            break
-                                    
-                                    container.Destroy()
+                                    cluster_obj = instance.find_cluster_by_id(cluster_id)
                                     
                                     if cluster_obj:
                                         try:
@@ -1353,10 +1361,7 @@ class VSphereHierarchicalLoader:
                                             # Filter out local datastores (containing "_local" in name)
                                             if resources.get('datastores'):
                                                 original_count = len(resources['datastores'])
-                                                resources['datastores'] = [
-                                                    ds for ds in resources['datastores'] 
-                                                    if "_local" not in ds['name']
-                                                ]
+                                                resources['datastores'] = vsphere_cluster_resources.filter_local_datastores(resources['datastores'])
                                                 filtered_count = len(resources['datastores'])
                                                 logger.info(f"Filtered datastores for cluster {resources.get('cluster_name', 'Unknown')}: {original_count} → {filtered_count}")
                                         except Exception as inner_e:
@@ -1445,11 +1450,10 @@ class VSphereHierarchicalLoader:
         logger.info(f"Starting background sync worker (interval: {self.sync_interval} seconds)")
         
         while not self.shutdown_event.is_set():
-            # Sleep for a bit before checking if it's time to sync
-            for _ in range(60):  # Check shutdown event every second
-                if self.shutdown_event.is_set():
-                    break
-                time.sleep(1)
+            # Wait a minute before checking if it's time to sync, unless a
+            # sync is requested or we're shutting down
+            self._sync_wake.wait(timeout=60)
+            self._sync_wake.clear()
             
             # Skip if we should be shutting down
             if self.shutdown_event.is_set():
@@ -1466,20 +1470,18 @@ class VSphereHierarchicalLoader:
                         continue
                     
                     # Check when we last synced
-                    last_sync = self.status.get('last_sync')
-                    if last_sync:
-                        try:
-                            last_sync_time = datetime.fromisoformat(last_sync)
-                            time_since_sync = datetime.now() - last_sync_time
-                            
-                            if time_since_sync.total_seconds() >= self.sync_interval:
-                                should_sync = True
-                                logger.info(f"Time to sync resources (last sync: {time_since_sync.total_seconds()/60:.1f} minutes ago)")
-                            else:
-                                logger.debug(f"Skipping sync, not enough time elapsed ({time_since_sync.total_seconds()/60:.1f} minutes since last sync)")
-                        except (ValueError, TypeError) as e:
-                            logger.warning(f"Error parsing last sync time: {str(e)}")
+                    if self._sync_requested:
+                        self._sync_requested = False
+                        should_sync = True
+                        logger.info("Sync requested, syncing resources now")
+                    elif self._last_sync_time is not None:
+                        time_since_sync = time.monotonic() - self._last_sync_time
+                        
+                        if time_since_sync >= self.sync_interval:
                             should_sync = True
+                            logger.info(f"Time to sync resources (last sync: {time_since_sync/60:.1f} minutes ago)")
+                        else:
+                            logger.debug(f"Skipping sync, not enough time elapsed ({time_since_sync/60:.1f} minutes since last sync)")
                     else:
                         # No record of last sync, do one now
                         should_sync = True
@@ -1497,6 +1499,12 @@ class VSphereHierarchicalLoader:
                         with self.lock:
                             clusters_to_sync = list(self.status['loaded_resources_for'])
                         
+                        # Fresh resources are collected and written to Redis in one pipeline
+                        creds_hash = vsphere_redis_cache.get_credentials_hash(
+                            self.server, self.username, self.password
+                        )
+                        cache_entries = []
+                        
                         # Sync resources for used clusters
                         for cluster_id in clusters_to_sync:
                             # Skip if shutting down
@@ -1511,10 +1519,19 @@ class VSphereHierarchicalLoader:
                             
                             try:
                                 logger.info(f"Syncing resources for cluster: {cluster_name or cluster_id}")
-                                self._sync_cluster_resources(cluster_id, cluster_name)
+                                synced = self._sync_cluster_resources(cluster_id, cluster_name)
+                                if synced:
+                                    cache_entries.extend(
+                                        (cluster_id, res_type, synced[res_type], creds_hash)
+                                        for res_type in ('datastores', 'networks', 'templates', 'resource_pools')
+                                    )
                             except Exception as e:
                                 logger.error(f"Error syncing resources for cluster {cluster_id}: {str(e)}")
                         
+                        # Refresh the Redis cache for every synced cluster at once
+                        if cache_entries:
+                            vsphere_redis_cache.cache_many_cluster_resources(cache_entries)
+                        
                         # Save to cache
                         self._save_to_cache()
                         
@@ -1524,6 +1541,7 @@ class VSphereHierarchicalLoader:
                         with self.lock:
                             self.status['is_syncing'] = False
                             self.status['last_sync'] = datetime.now().isoformat()
+                            self._last_sync_time = time.monotonic()
                             
                             # Emit sync completed event
                             self._add_event('background_sync_completed', {
@@ -1548,7 +1566,13 @@ class VSphereHierarchicalLoader:
         logger.info("Background sync worker exiting")
     
     def _sync_cluster_resources(self, cluster_id, cluster_name=None):
-        """Sync resources for a specific cluster, updating only changed data."""
+        """
+        Sync resources for a specific cluster, updating only changed data.
+        
+        Returns:
+            dict: The fresh resources, or None if nothing was fetched (including
+            when the cluster had no data and was fully loaded instead)
+        """
         # Get existing resources
         existing_resources = None
         
@@ -1572,107 +1596,123 @@ class VSphereHierarchicalLoader:
         
         # Get fresh resources from vSphere
         try:
-            # Get a connection
-            instance = vsphere_cluster_resources.get_instance()
-            if not instance.connect():
-                logger.error(f"Failed to connect to vSphere during sync for cluster {cluster_id}")
+            # Get fresh resources, overlapping the independent vCenter
+            # calls; each worker uses its own session
+            futures = {res_type: self._sync_pool.submit(self._fetch_on_own_session, res_type, cluster_id)
+                       for res_type in SYNC_FETCHERS}
+            new_resources = {res_type: future.result() for res_type, future in futures.items()}
+            
+            if any(resources is None for resources in new_resources.values()):
+                logger.warning(f"Could not find cluster object for ID {cluster_id} during sync")
                 return
             
-            try:
-                # Find the cluster object
-                cluster_obj = None
-                container = instance.content.viewManager.CreateContainerView(
-                    instance.content.rootFolder, [vim.ClusterComputeResource], True)
-                
-                for cluster in container.view:
-                    if str(cluster._moId) == cluster_id:
-                        cluster_obj = cluster
-                        break
-                
-                container.Destroy()
-                
-                if not cluster_obj:
-                    logger.warning(f"Could not find cluster object for ID {cluster_id} during sync")
-                    return
-                
-                # Get fresh resources
-                new_resources = {
-                    'cluster_name': cluster_name or existing_resources.get('cluster_name', cluster_id),
-                    'cluster_id': cluster_id,
-                    'datastores': instance.get_datastores_by_cluster(cluster_obj),
-                    'networks': instance.get_networks_by_cluster(cluster_obj),
-                    'templates': instance.get_templates_by_cluster(cluster_obj),
-                    'resource_pools': instance.get_resource_pools_by_cluster(cluster_obj),
-                    'last_update': datetime.now().isoformat()
-                }
+            new_resources.update({
+                'cluster_name': cluster_name or existing_resources.get('cluster_name', cluster_id),
+                'cluster_id': cluster_id,
+                'last_update': datetime.now().isoformat()
+            })
+            
+            # Filter out local datastores
+            if 'datastores' in new_resources:
+                original_count = len(new_resources['datastores'])
+                new_resources['datastores'] = vsphere_cluster_resources.filter_local_datastores(new_resources['datastores'])
+                filtered_count = len(new_resources['datastores'])
+                logger.debug(f"Filtered datastores during sync: {original_count} → {filtered_count}")
+            
+            # Compare and update resources
+            with self.lock:
+                # Update each resource type, tracking changes
+                for res_type in ['datastores', 'networks', 'templates', 'resource_pools']:
+                    # Skip if not in both new and existing resources
+                    if res_type not in new_resources or res_type not in existing_resources:
+                        continue
+                    
+                    # Create lookup dictionaries by ID
+                    existing_by_id = {r['id']: r for r in existing_resources.get(res_type, [])}
+                    new_by_id = {r['id']: r for r in new_resources.get(res_type, [])}
                 
-                # Filter out local datastores
-                if 'datastores' in new_resources:
-                    original_count = len(new_resources['datastores'])
-                    new_resources['datastores'] = [
-                        ds for ds in new_resources['datastores'] 
-                        if "_local" not in ds['name']
-                    ]
-                    filtered_count = len(new_resources['datastores'])
-                    logger.debug(f"Filtered datastores during sync: {original_count} → {filtered_count}")
+                    # Find added, removed, and changed resources
+                    added_ids = set(new_by_id.keys()) - set(existing_by_id.keys())
+                    removed_ids = set(existing_by_id.keys()) - set(new_by_id.keys())
+                    common_ids = set(existing_by_id.keys()) & set(new_by_id.keys())
                 
-                # Compare and update resources
-                with self.lock:
-                    # Update each resource type, tracking changes
-                    for res_type in ['datastores', 'networks', 'templates', 'resource_pools']:
-                        # Skip if not in both new and existing resources
-                        if res_type not in new_resources or res_type not in existing_resources:
-                            continue
+                    # Check for changes in common resources
+                    changed_ids = set()
+                    for res_id in common_ids:
+                        # Check for significant changes
+                        if res_type == 'datastores':
+                            # For datastores, check free space
+                            if 'free_gb' in new_by_id[res_id] and 'free_gb' in existing_by_id[res_id]:
+                                # If free space changed by more than 5%, consider it changed
+                                new_free = new_by_id[res_id]['free_gb']
+                                old_free = existing_by_id[res_id]['free_gb']
                             
-                        # Create lookup dictionaries by ID
-                        existing_by_id = {r['id']: r for r in existing_resources.get(res_type, [])}
-                        new_by_id = {r['id']: r for r in new_resources.get(res_type, [])}
-                        
-                        # Find added, removed, and changed resources
-                        added_ids = set(new_by_id.keys()) - set(existing_by_id.keys())
-                        removed_ids = set(existing_by_id.keys()) - set(new_by_id.keys())
-                        common_ids = set(existing_by_id.keys()) & set(new_by_id.keys())
-                        
-                        # Check for changes in common resources
-                        changed_ids = set()
-                        for res_id in common_ids:
-                            # Check for significant changes
-                            if res_type == 'datastores':
-                                # For datastores, check free space
-                                if 'free_gb' in new_by_id[res_id] and 'free_gb' in existing_by_id[res_id]:
-                                    # If free space changed by more than 5%, consider it changed
-                                    new_free = new_by_id[res_id]['free_gb']
-                                    old_free = existing_by_id[res_id]['free_gb']
-                                    
-                                    if abs(new_free - old_free) > (old_free * 0.05):
-                                        changed_ids.add(res_id)
-                            # Other resource types - just consider them unchanged for now
-                        
-                        # Update counts for logging
-                        changes[res_type]['added'] = len(added_ids)
-                        changes[res_type]['removed'] = len(removed_ids)
-                        changes[res_type]['changed'] = len(changed_ids)
-                        
-                    # Update our stored resources with the fresh data
-                    self.resources_by_cluster[cluster_id] = new_resources
-                    
-                # Log changes
-                for res_type, counts in changes.items():
-                    if counts['added'] > 0 or counts['removed'] > 0 or counts['changed'] > 0:
-                        logger.info(f"Cluster {cluster_id} {res_type} changes: +{counts['added']}, -{counts['removed']}, Δ{counts['changed']}")
+                                if abs(new_free - old_free) > (old_free * 0.05):
+                                    changed_ids.add(res_id)
+                        # Other resource types - just consider them unchanged for now
                 
-            finally:
-                # Always disconnect
-                instance.disconnect()
+                    # Update counts for logging
+                    changes[res_type]['added'] = len(added_ids)
+                    changes[res_type]['removed'] = len(removed_ids)
+                    changes[res_type]['changed'] = len(changed_ids)
                 
+                # Update our stored resources with the fresh data
+                self.resources_by_cluster[cluster_id] = new_resources
+            
+            # Log changes
+            for res_type, counts in changes.items():
+                if counts['added'] > 0 or counts['removed'] > 0 or counts['changed'] > 0:
+                    logger.info(f"Cluster {cluster_id} {res_type} changes: +{counts['added']}, -{counts['removed']}, Δ{counts['changed']}")
+            
+            return new_resources
+            
         except Exception as e:
             logger.exception(f"Error syncing resources for cluster {cluster_id}: {str(e)}")
             # Don't update anything if we encountered an error
     
+    def _fetch_on_own_session(self, res_type, cluster_id):
+        """
+        Fetch one resource type for a cluster on the calling worker's own vSphere session.
+        
+        pyVmomi stubs are not safe to share between threads, so each sync
+        fetch worker logs in separately and looks the cluster up by ID on
+        its own session. The session is kept between syncs and logged out
+        once it sits idle.
+        
+        Returns:
+            list: The resources, or None if the cluster was not found
+        """
+        instance = getattr(self._fetch_sessions, 'instance', None)
+        if instance is None:
+            instance = vsphere_cluster_resources.VSphereClusterResources(
+                server=self.server, username=self.username,
+                password=self.password, timeout=self.timeout)
+            self._fetch_sessions.instance = instance
+            with self.lock:
+                self._fetch_instances.append(instance)
+        
+        if not instance.connect():
+            raise ConnectionError(f"Failed to connect to vSphere to sync {res_type} for cluster {cluster_id}")
+        try:
+            cluster_obj = instance.find_cluster_by_id(cluster_id)
+            if not cluster_obj:
+                return None
+            return getattr(instance, SYNC_FETCHERS[res_type])(cluster_obj)
+        finally:
+            # Release the session; it is only logged out after sitting idle
+            instance.disconnect()
+    
+    def request_sync(self):
+        """Ask the background sync worker to sync now instead of waiting for the interval."""
+        with self.lock:
+            self._sync_requested = True
+        self._sync_wake.set()
+    
     def shutdown(self):
         """Shutdown the hierarchical loader and its threads."""
         # Signal all threads to exit
         self.shutdown_event.set()
+        self._sync_wake.set()
         
         # Wait for worker threads to finish
         for thread in self.worker_threads:
@@ -1682,6 +1722,13 @@ class VSphereHierarchicalLoader:
         # Clear thread list
         self.worker_threads.clear()
         
+        # Stop the fetch pool; the sync worker has exited so nothing new arrives
+        self._sync_pool.shutdown(wait=False)
+        with self.lock:
+            fetch_instances, self._fetch_instances = self._fetch_instances, []
+        for instance in fetch_instances:
+            instance.close()
+        
         # Wait for event thread
         if self.event_thread.is_alive():
             self.event_thread.join(timeout=1.0)
@@ -1689,6 +1736,12 @@ class VSphereHierarchicalLoader:
         # Save cache one last time
         self._save_to_cache()
         
+        # Close the vSphere session kept open between syncs
+        try:
+            vsphere_cluster_resources.get_instance().close()
+        except Exception as e:
+            logger.debug(f"Error closing vSphere session: {str(e)}")
+        
         logger.info("Hierarchical loader shutdown complete")
 
 # Singleton instance
@@ -1732,6 +1785,11 @@ def get_loading_status():
     loader = get_loader()
     return loader.get_status()
 
+def request_sync():
+    """Trigger a background sync of loaded cluster resources without waiting for the interval."""
+    loader = get_loader()
+    loader.request_sync()
+
 def add_event_listener(listener):
     """Add a listener for resource fetch events."""
     loader = get_loader()
@@ -109,9 +109,9 @@ def _load_resources_from_file(file_path: str) -> Dict[str, str]:
                 # For minimal resources file
                 if 'ResourcePools' in data and data['ResourcePools']:
                     # Try to find a production resource pool first
-                    prod_pools = [rp for rp in data['ResourcePools'] if 'prod' in rp.get('name', '').lower()]
-                    if prod_pools:
-                        resources['resource_pool_id'] = prod_pools[0]['id']
+                    prod_pool = next((rp for rp in data['ResourcePools'] if 'prod' in rp.get('name', '').lower()), None)
+                    if prod_pool:
+                        resources['resource_pool_id'] = prod_pool['id']
                     else:
                         # Use the first resource pool as fallback
                         resources['resource_pool_id'] = data['ResourcePools'][0]['id']
@@ -121,18 +121,18 @@ def _load_resources_from_file(file_path: str) -> Dict[str, str]:
                 
                 if 'Networks' in data and data['Networks']:
                     # Try to find a production network first
-                    prod_nets = [net for net in data['Networks'] if 'prod' in net.get('name', '').lower()]
-                    if prod_nets:
-                        resources['network_id'] = prod_nets[0]['id']
+                    prod_net = next((net for net in data['Networks'] if 'prod' in net.get('name', '').lower()), None)
+                    if prod_net:
+                        resources['network_id'] = prod_net['id']
                     else:
                         # Use the first network as fallback
                         resources['network_id'] = data['Networks'][0]['id']
                 
                 if 'Templates' in data and data['Templates']:
-                    # Try to find a RHEL9 template first
-                    rhel9_templates = [tpl for tpl in data['Templates'] if 'rhel9' in tpl.get('name', '').lower()]
-                    if rhel9_templates:
-                        resources['template_uuid'] = rhel9_templates[0]['id']
+                    # Try to find a RHEL9 template first, stopping at the first match
+                    rhel9_template = next((tpl for tpl in data['Templates'] if 'rhel9' in tpl.get('name', '').lower()), None)
+                    if rhel9_template:
+                        resources['template_uuid'] = rhel9_template['id']
                     else:
                         # Use the first template as fallback
                         resources['template_uuid'] = data['Templates'][0]['id']
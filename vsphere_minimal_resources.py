@@ -23,6 +23,7 @@ import json
 import time
 import gzip
 import gc
+from itertools import islice
 from datetime import datetime
 import logging
 from pathlib import Path
@@ -86,26 +87,18 @@ def decompress_data(compressed_data: bytes) -> Any:
 
 def stream_resources(objects, processor_func, resource_type, batch_size=BATCH_SIZE):
     """Process resources in batches to reduce memory usage."""
-    batch = []
-    count = 0
+    it = iter(objects)
     
-    for obj in objects:
-        batch.append(obj)
-        count += 1
+    while True:
+        batch = list(islice(it, batch_size))
+        if not batch:
+            break
         
-        if len(batch) >= batch_size:
-            processed_batch = processor_func(batch, resource_type)
-            yield from processed_batch
-            
-            # Clear batch and explicitly run garbage collection if needed
-            batch = []
-            if EXPLICIT_GC:
-                gc.collect()
-    
-    # Process any remaining items in the final batch
-    if batch:
-        processed_batch = processor_func(batch, resource_type)
-        yield from processed_batch
+        yield from processor_func(batch, resource_type)
+        
+        # Explicitly run garbage collection between batches if needed
+        if EXPLICIT_GC:
+            gc.collect()
 
 def process_batch(batch, resource_type):
     """Process a batch of resources, applying pruning to each item."""
@@ -203,12 +196,9 @@ def get_obj(content, vimtype, name=None):
                     return obj
             return None
         else:
-            # If memory usage is a concern, use a generator
-            if ENABLE_STREAMING:
-                obj_list = list(container.view)
-            else:
-                obj_list = container.view
-            return obj_list
+            # The view property is fetched into its own array, so it stays
+            # valid after the container is destroyed without another copy
+            return container.view
     finally:
         # Always destroy the container view to free resources
         container.Destroy()
@@ -221,13 +211,9 @@ def get_all_obj(content, vimtype, folder=None, recurse=True):
     container = content.viewManager.CreateContainerView(folder, vimtype, recurse)
     
     try:
-        # Return objects as list or generator based on memory optimization settings
-        if ENABLE_STREAMING:
-            # Create a separate list to avoid memory leak from container view reference
-            result = list(container.view)
-            return result
-        else:
-            return container.view
+        # The view property is fetched into its own array, so it stays
+        # valid after the container is destroyed without another copy
+        return container.view
     finally:
         # Always destroy the container view to free resources
         container.Destroy()
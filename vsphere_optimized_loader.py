@@ -10,6 +10,7 @@ import ssl
 import json
 import time
 import logging
+import functools
 from datetime import datetime, timedelta
 from threading import Lock
 from pathlib import Path
@@ -17,6 +18,7 @@ from pathlib import Path
 try:
     from pyVim import connect
     from pyVmomi import vim
+    from vsphere_utils import get_datacenters, retrieve_view_properties
 except ImportError:
     logging.error("Required packages not installed. Run: pip install pyVmomi")
 
@@ -32,6 +34,11 @@ CACHE_LOCK = Lock()  # Lock for thread-safety
 DEFAULT_TIMEOUT = int(os.environ.get('VSPHERE_TIMEOUT', '30'))
 DEFAULT_DATACENTERS = os.environ.get('VSPHERE_DATACENTERS', '').split(',')
 
+@functools.lru_cache(maxsize=None)
+def _get_cache_path(resource_type):
+    """Get the cache file path for a resource type (memoized)."""
+    return os.path.join(CACHE_DIR, f"{resource_type}.json")
+
 class VSphereOptimizedLoader:
     """Optimized loader for vSphere resources with enhanced caching and performance."""
     
@@ -89,31 +96,25 @@ class VSphereOptimizedLoader:
             self.service_instance = None
             self.content = None
     
-    def _get_cache_path(self, resource_type):
-        """Get the cache file path for a resource type."""
-        return os.path.join(CACHE_DIR, f"{resource_type}.json")
-    
     def _is_cache_valid(self, resource_type):
         """Check if cache for a resource type is valid."""
-        cache_path = self._get_cache_path(resource_type)
-        
-        if not os.path.exists(cache_path):
+        # A single stat() covers both the existence and the age check
+        try:
+            st = os.stat(_get_cache_path(resource_type))
+        except FileNotFoundError:
             return False
-            
-        # Check cache age
-        file_age = time.time() - os.path.getmtime(cache_path)
-        return file_age < CACHE_TTL
+        return time.time() - st.st_mtime < CACHE_TTL
     
     def _save_cache(self, resource_type, data):
         """Save data to cache."""
         with CACHE_LOCK:
-            with open(self._get_cache_path(resource_type), 'w') as f:
+            with open(_get_cache_path(resource_type), 'w') as f:
                 json.dump(data, f, indent=2)
     
     def _load_cache(self, resource_type):
         """Load data from cache."""
         try:
-            with open(self._get_cache_path(resource_type), 'r') as f:
+            with open(_get_cache_path(resource_type), 'r') as f:
                 return json.load(f)
         except (FileNotFoundError, json.JSONDecodeError):
             return None
@@ -123,18 +124,7 @@ class VSphereOptimizedLoader:
         if not self.content:
             return []
             
-        datacenter_list = []
-        container = self.content.viewManager.CreateContainerView(
-            self.content.rootFolder, [vim.Datacenter], True)
-        
-        for dc in container.view:
-            # Skip if not in the filter list (if provided)
-            if filter_names and dc.name not in filter_names:
-                continue
-            datacenter_list.append(dc)
-        
-        container.Destroy()
-        return datacenter_list
+        return get_datacenters(self.content, filter_names)
     
     def get_resource_info(self, obj, obj_type):
         """Get basic info about a vSphere resource."""
@@ -236,19 +226,31 @@ class VSphereOptimizedLoader:
             folder, [vim.VirtualMachine], True)
         
         result = []
-        template_count = 0
         
-        for vm in container.view:
-            # Check if it's a template
-            if vm.config and vm.config.template:
+        try:
+            # Fetch name and template flag for all VMs with the PropertyCollector rather than
+            # touching vm.config.template (a SOAP call) per VM
+            vm_props = retrieve_view_properties(
+                self.content, container, vim.VirtualMachine, ['name', 'config.template'])
+            
+            for vm, props in vm_props:
+                # Check if it's a template
+                if not props.get('config.template'):
+                    continue
+                
                 # Apply limiting
-                if limit and template_count >= limit:
+                if limit and len(result) >= limit:
                     break
-                    
-                result.append(self.get_resource_info(vm, 'VirtualMachine'))
-                template_count += 1
+                
+                result.append({
+                    'name': props.get('name'),
+                    'id': str(vm._moId),
+                    'type': 'VirtualMachine',
+                    'is_template': True
+                })
+        finally:
+            container.Destroy()
         
-        container.Destroy()
         return result
     
     def get_vsphere_resources(self, use_cache=True, force_refresh=False, 
@@ -17,14 +17,15 @@ performance and reduce load on the vSphere server. It implements:
 import os
 import logging
 import time
-import json
 import hashlib
 import functools
+import itertools
+import operator
+import gzip
+import random
 import threading
 import queue
-import gzip
-import pickle
-from datetime import datetime, timedelta
+import concurrent.futures
 
 # Import Redis
 try:
@@ -33,6 +34,34 @@ except ImportError:
     logging.error("Required redis package not installed. Run: pip install redis")
     raise
 
+# Import msgspec for fast binary serialization of cached resource lists
+try:
+    import msgspec
+except ImportError:
+    logging.error("Required msgspec package not installed. Run: pip install msgspec")
+    raise
+
+# Import orjson for the JSON values cached under plain keys
+try:
+    import orjson
+except ImportError:
+    logging.error("Required orjson package not installed. Run: pip install orjson")
+    raise
+
+# Import cachetools for the in-process cache in front of Redis
+try:
+    import cachetools
+except ImportError:
+    logging.error("Required cachetools package not installed. Run: pip install cachetools")
+    raise
+
+# Import zstandard for payload compression
+try:
+    import zstandard as zstd
+except ImportError:
+    logging.error("Required zstandard package not installed. Run: pip install zstandard")
+    raise
+
 # Configure logging
 logger = logging.getLogger(__name__)
 
@@ -41,16 +70,23 @@ REDIS_HOST = os.environ.get('REDIS_HOST', 'localhost')
 REDIS_PORT = int(os.environ.get('REDIS_PORT', 6379))
 REDIS_DB = int(os.environ.get('REDIS_DB', 0))
 REDIS_PASSWORD = os.environ.get('REDIS_PASSWORD', '')
+REDIS_POOL_SIZE = int(os.environ.get('REDIS_POOL_SIZE', 32))
 
 # Cache settings
 CACHE_PREFIX = 'vsphere:'
 CACHE_TTL = int(os.environ.get('VSPHERE_CACHE_EXPIRY', 3600))  # 1 hour default
+CACHE_TTL_NS = CACHE_TTL * 1_000_000_000
 RESOURCE_TYPES = ['datastores', 'networks', 'resource_pools', 'templates']
+SCAN_BATCH_SIZE = 500  # Keys per SCAN page and per pipelined delete flush
+CREDS_INDEX_KEY = f"{CACHE_PREFIX}creds_hashes"  # Set of credential hashes with cached data
 
 # Memory optimization settings
 COMPRESSION_ENABLED = os.environ.get('VSPHERE_CACHE_COMPRESSION', 'true').lower() == 'true'
-COMPRESSION_LEVEL = int(os.environ.get('VSPHERE_CACHE_COMPRESSION_LEVEL', '6'))  # 1-9, higher is more compression
+COMPRESSION_CODEC = os.environ.get('VSPHERE_CACHE_CODEC', 'zstd').lower()  # zstd, or gzip for rollback
+COMPRESSION_LEVEL = int(os.environ.get('VSPHERE_CACHE_COMPRESSION_LEVEL', '1'))  # zstd 1-22 / gzip 1-9, higher is more compression
+COMPRESSION_MIN_BYTES = int(os.environ.get('VSPHERE_CACHE_COMPRESSION_MIN_BYTES', '512'))  # Smaller payloads are stored uncompressed
 PRUNE_UNUSED_ATTRS = os.environ.get('VSPHERE_CACHE_PRUNE_ATTRS', 'true').lower() == 'true'
+MAX_PAYLOAD_BYTES = int(os.environ.get('VSPHERE_CACHE_MAX_BYTES', 4 * 1024 * 1024))  # Larger lists are not cached
 
 # Resource attribute maps (only these attributes will be kept if pruning is enabled)
 ESSENTIAL_ATTRIBUTES = {
@@ -60,50 +96,166 @@ ESSENTIAL_ATTRIBUTES = {
     'templates': ['name', 'id', 'type', 'cluster_id', 'cluster_name', 'is_template', 'guest_id', 'guest_fullname']
 }
 
-# Redis connection pool
-_redis_pool = None
-_binary_redis_pool = None  # For binary data (compressed objects)
+# Precomputed key tuples and getters used when pruning resources
+_ESSENTIAL_KEYS = {rt: tuple(attrs) for rt, attrs in ESSENTIAL_ATTRIBUTES.items()}
+_ESSENTIAL_GETTERS = {rt: operator.itemgetter(*attrs) for rt, attrs in _ESSENTIAL_KEYS.items()}
+
+# Reusable MessagePack encoder/decoder for resource payloads
+_ENC = msgspec.msgpack.Encoder()
+_DEC = msgspec.msgpack.Decoder()
+
+# Short-lived in-process cache in front of Redis, holding uncompressed
+# resource lists and known misses, so repeated lookups during a page render
+# skip Redis. Values are kept encoded (MessagePack or JSON bytes) and decoded
+# on every hit, so a caller changing what it got back can't alter what later
+# callers see.
+LOCAL_CACHE_TTL = float(os.environ.get('VSPHERE_LOCAL_CACHE_TTL', '5'))
+_local_cache = cachetools.TTLCache(maxsize=1024, ttl=LOCAL_CACHE_TTL)
+_local_cache_lock = threading.Lock()
+_CACHE_MISS = object()
+
+# Bumped on every write to the local cache's backing data. A lookup only
+# stores what it read from Redis if no write happened in the meantime, so a
+# slow reader can't put back a value that a write just replaced.
+_local_epoch = 0
+
+def _evict_local(cluster_id, resource_type=None, creds_hash=None):
+    """Drop in-process entries for a cluster (optionally one type/credentials)."""
+    global _local_epoch
+    with _local_cache_lock:
+        _local_epoch += 1
+        for key in list(_local_cache.keys()):
+            if (key[0] == cluster_id
+                    and (resource_type is None or key[1] == resource_type)
+                    and (creds_hash is None or key[2] == creds_hash)):
+                _local_cache.pop(key, None)
+
+def _clear_local():
+    """Drop every in-process entry."""
+    global _local_epoch
+    with _local_cache_lock:
+        _local_epoch += 1
+        _local_cache.clear()
+
+# Compressed payloads start with a format byte naming the codec, so entries
+# written with either codec decode correctly while the setting is changed
+ZSTD_PAYLOAD = b'\x01'
+GZIP_PAYLOAD = b'\x02'
+
+# zstd contexts and encode buffers are not safe to share between threads
+_zstd_local = threading.local()
+
+def _encode_buffer():
+    """Get the reusable MessagePack encode buffer for the current thread."""
+    buf = getattr(_zstd_local, 'buf', None)
+    if buf is None:
+        buf = _zstd_local.buf = bytearray()
+    return buf
+
+def _zstd_compressor():
+    """Get the zstd compressor for the current thread."""
+    cctx = getattr(_zstd_local, 'cctx', None)
+    if cctx is None:
+        cctx = _zstd_local.cctx = zstd.ZstdCompressor(level=COMPRESSION_LEVEL)
+    return cctx
+
+def _zstd_decompressor():
+    """Get the zstd decompressor for the current thread."""
+    dctx = getattr(_zstd_local, 'dctx', None)
+    if dctx is None:
+        dctx = _zstd_local.dctx = zstd.ZstdDecompressor()
+    return dctx
+
+# Shared Redis client (redis.Redis is thread-safe and pools its connections).
+# Responses are raw bytes: payloads go straight to the MessagePack decoder and
+# the few text values that are needed are decoded explicitly.
+_redis_client = None
+_client_lock = threading.Lock()
 
 def get_redis_connection(binary=False):
-    """Get a Redis connection from the pool."""
-    global _redis_pool, _binary_redis_pool
+    """
+    Get the shared Redis client.
+    
+    The `binary` flag is accepted for backwards compatibility; all responses
+    are returned as bytes.
+    """
+    global _redis_client
     
-    # Choose the appropriate pool based on binary flag
-    pool_ref = _binary_redis_pool if binary else _redis_pool
-    pool_var_name = "_binary_redis_pool" if binary else "_redis_pool"
+    if _redis_client is not None:
+        return _redis_client
     
-    if pool_ref is None:
+    with _client_lock:
+        # Another thread may have created the client while we waited
+        if _redis_client is not None:
+            return _redis_client
+        
         try:
-            # Create connection pool
-            pool_ref = redis.ConnectionPool(
+            # Create a bounded connection pool; threads wait for a free
+            # connection rather than erroring when all are in use
+            pool = redis.BlockingConnectionPool(
+                max_connections=REDIS_POOL_SIZE,
+                timeout=5.0,             # Wait up to 5 seconds for a free connection
                 host=REDIS_HOST,
                 port=REDIS_PORT,
                 db=REDIS_DB,
                 password=REDIS_PASSWORD,
-                decode_responses=not binary,  # Don't decode responses for binary data
                 socket_timeout=5.0,      # Timeout after 5 seconds
                 socket_connect_timeout=5.0,
+                socket_keepalive=True,
+                socket_read_size=524288,  # Read large payloads in fewer recv() calls
                 health_check_interval=30,
                 retry_on_timeout=True
             )
-            logger.info(f"Redis connection pool created for {REDIS_HOST}:{REDIS_PORT} ({pool_var_name})")
+            _redis_client = redis.Redis(connection_pool=pool)
+            logger.info(f"Redis client created for {REDIS_HOST}:{REDIS_PORT}")
             
-            # Update the global variable
-            if binary:
-                _binary_redis_pool = pool_ref
+            # redis-py picks the hiredis C parser automatically when it is installed
+            if redis.utils.HIREDIS_AVAILABLE:
+                logger.info("Redis responses parsed with hiredis")
             else:
-                _redis_pool = pool_ref
-                
+                logger.warning("hiredis not installed; Redis responses use the pure-Python parser. Run: pip install hiredis")
         except Exception as e:
-            logger.error(f"Error creating Redis connection pool: {str(e)}")
+            logger.error(f"Error creating Redis client: {str(e)}")
             return None
     
-    try:
-        # Get connection from pool
-        return redis.Redis(connection_pool=pool_ref)
-    except Exception as e:
-        logger.error(f"Error getting Redis connection: {str(e)}")
-        return None
+    return _redis_client
+
+def _decode(value):
+    """Decode a bytes response to str (None passes through)."""
+    return value.decode() if isinstance(value, bytes) else value
+
+def retry_redis(max_retries=3, delay=0.05, max_delay=0.5):
+    """
+    Retry decorator for transient Redis timeouts and connection errors.
+    
+    Uses exponential backoff with full jitter so callers hitting a degraded
+    Redis at the same moment don't retry in lockstep.
+    
+    Args:
+        max_retries (int): Maximum number of attempts
+        delay (float): Initial backoff ceiling in seconds
+        max_delay (float): Upper bound for the backoff ceiling in seconds
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            mdelay = delay
+            for attempt in range(1, max_retries + 1):
+                try:
+                    return func(*args, **kwargs)
+                except (redis.exceptions.TimeoutError, redis.exceptions.ConnectionError) as e:
+                    # If this was the last attempt, reraise
+                    if attempt == max_retries:
+                        raise
+                    
+                    sleep_time = random.uniform(0, mdelay)
+                    logger.debug(f"Redis call {func.__name__} failed, retrying in {sleep_time:.3f}s: {str(e)}")
+                    time.sleep(sleep_time)
+                    
+                    # Increase delay for next retry
+                    mdelay = min(mdelay * 2, max_delay)
+        return wrapper
+    return decorator
 
 def test_redis_connection():
     """Test the Redis connection and return status."""
@@ -113,159 +265,592 @@ def test_redis_connection():
             return False
         
         # Ping the server to make sure it's alive
-        result = r.ping()
-        
-        # Also test binary connection if compression is enabled
-        if COMPRESSION_ENABLED:
-            r_bin = get_redis_connection(binary=True)
-            if r_bin is None:
-                logger.warning("Binary Redis connection failed but text connection succeeded")
-                # Continue anyway with only text connection
-            else:
-                r_bin.ping()  # Just to test it works
-                
-        return result
+        return r.ping()
     except Exception as e:
         logger.error(f"Redis connection test failed: {str(e)}")
         return False
 
+@functools.lru_cache(maxsize=128)
 def get_credentials_hash(server, username, password):
     """
     Create a hash of the vSphere credentials to use as a cache key component.
     This ensures resources are not mixed between different vSphere connections.
     """
     creds = f"{server}:{username}:{password}"
-    return hashlib.md5(creds.encode()).hexdigest()[:10]
+    return hashlib.blake2b(creds.encode(), digest_size=5).hexdigest()
+
+@functools.lru_cache(maxsize=4096)
+def get_cluster_cache_key(cluster_id, creds_hash):
+    """
+    Generate the Redis hash key holding all cached resources of a cluster.
+    
+    Each resource type is a field of the hash (with ts:<type>, raw:<type>
+    and dg:<type> fields for its update time, uncompressed size and payload
+    digest). The {creds} hashtag
+    puts it in the same slot as that credentials' index sets, so the write
+    script only touches keys in one slot on Redis Cluster.
+    """
+    return f"{CACHE_PREFIX}{{{creds_hash}}}:cluster:{cluster_id}:resources"
+
+@functools.lru_cache(maxsize=64)
+def _ts_field(resource_type):
+    """Cluster hash field holding a resource type's update time."""
+    return "ts:" + resource_type
+
+@functools.lru_cache(maxsize=64)
+def _raw_field(resource_type):
+    """Cluster hash field holding a resource type's uncompressed size."""
+    return "raw:" + resource_type
+
+@functools.lru_cache(maxsize=64)
+def _digest_field(resource_type):
+    """Cluster hash field holding a digest of a resource type's payload."""
+    return "dg:" + resource_type
+
+@functools.lru_cache(maxsize=256)
+def _index_key(creds_hash, resource_type):
+    """Redis sorted set of the clusters cached for a resource type, scored by expiry time (ms)."""
+    return f"{CACHE_PREFIX}{{{creds_hash}}}:cached:{resource_type}"
+
+@functools.lru_cache(maxsize=256)
+def _compressed_index_key(creds_hash, resource_type):
+    """Redis sorted set of the clusters whose cached entry is compressed, scored by expiry time (ms)."""
+    return f"{CACHE_PREFIX}{{{creds_hash}}}:cached:{resource_type}:compressed"
+
+def scan_keys(r, pattern):
+    """Iterate over keys matching a pattern using non-blocking SCAN."""
+    return r.scan_iter(match=pattern, count=SCAN_BATCH_SIZE)
 
-def get_cache_key(resource_type, resource_id, creds_hash):
-    """Generate a Redis cache key for a specific resource type and ID."""
-    return f"{CACHE_PREFIX}{creds_hash}:{resource_type}:{resource_id}"
+def delete_keys(r, keys):
+    """
+    Delete keys in pipelined batches. Returns the number of keys deleted.
+    
+    Uses UNLINK so Redis reclaims the memory in a background thread instead
+    of blocking other clients while large payloads are freed.
+    """
+    deleted = 0
+    batch = []
+    for key in keys:
+        batch.append(key)
+        if len(batch) >= SCAN_BATCH_SIZE:
+            deleted += _delete_batch(r, batch)
+            batch = []
+    if batch:
+        deleted += _delete_batch(r, batch)
+    return deleted
 
-def get_compressed_cache_key(resource_type, resource_id, creds_hash):
-    """Generate a compressed Redis cache key with a compression indicator."""
-    return f"{CACHE_PREFIX}{creds_hash}:{resource_type}:{resource_id}:compressed"
+def _delete_batch(r, batch):
+    """Send a single pipelined UNLINK for a batch of keys."""
+    pipe = r.pipeline(transaction=False)
+    pipe.unlink(*batch)
+    result = pipe.execute()
+    logger.debug(f"Deleted batch of {len(batch)} keys")
+    return result[0] or 0
 
 def prune_resource_attributes(resources, resource_type):
     """Remove unnecessary attributes from resource objects to save memory."""
     if not PRUNE_UNUSED_ATTRS or resource_type not in ESSENTIAL_ATTRIBUTES:
         return resources
         
-    essential_attrs = set(ESSENTIAL_ATTRIBUTES[resource_type])
+    keys = _ESSENTIAL_KEYS[resource_type]
+    getter = _ESSENTIAL_GETTERS[resource_type]
     pruned_resources = []
     
     for resource in resources:
         # Only keep essential attributes
-        pruned_resource = {k: v for k, v in resource.items() if k in essential_attrs}
+        try:
+            pruned_resource = dict(zip(keys, getter(resource)))
+        except KeyError:
+            # Some attributes are missing; keep only the ones present
+            pruned_resource = {k: resource[k] for k in keys if k in resource}
         pruned_resources.append(pruned_resource)
     
     return pruned_resources
 
+def _serialize_resources(resource_type, resources):
+    """
+    Prune and serialize resources.
+    
+    Returns:
+        tuple: (compressed, payload, raw size), or None if the serialized list
+        exceeds MAX_PAYLOAD_BYTES
+    """
+    # Prune attributes to save memory before caching
+    pruned_resources = prune_resource_attributes(resources, resource_type) if resources else resources
+    
+    # Serialize resources to MessagePack into a reused buffer so oversize
+    # lists are rejected before any further copies or compression
+    buf = _encode_buffer()
+    _ENC.encode_into(pruned_resources, buf)
+    raw_size = len(buf)
+    if raw_size > MAX_PAYLOAD_BYTES:
+        logger.warning(f"Not caching {len(resources)} {resource_type}: "
+                       f"{raw_size} bytes exceeds limit of {MAX_PAYLOAD_BYTES}")
+        return None
+    
+    # Small lists barely shrink, so compressing them only costs CPU
+    if COMPRESSION_ENABLED and raw_size >= COMPRESSION_MIN_BYTES:
+        # Compress data
+        if COMPRESSION_CODEC == 'gzip':
+            return True, GZIP_PAYLOAD + gzip.compress(buf, compresslevel=COMPRESSION_LEVEL), raw_size
+        return True, ZSTD_PAYLOAD + _zstd_compressor().compress(buf), raw_size
+    
+    return False, bytes(buf), raw_size
+
+def _decompress_payload(payload):
+    """Strip a cached payload's compression, returning the encoded bytes."""
+    # Neither MessagePack lists nor JSON text start with a format byte, so
+    # it doubles as the compression marker
+    marker = payload[:1]
+    # Skip the marker through a memoryview rather than copying the payload
+    if marker == ZSTD_PAYLOAD:
+        return _zstd_decompressor().decompress(memoryview(payload)[1:])
+    if marker == GZIP_PAYLOAD:
+        return gzip.decompress(memoryview(payload)[1:])
+    return payload
+
+# Atomically store one cache entry: payload and timestamp fields, TTLs and
+# the index sets, returning 1 when the cluster is newly indexed for the
+# resource type. All keys share the {creds} hashtag, i.e. one cluster slot.
+# The index sets are scored by expiry time, so stats count live entries with
+# ZCOUNT and nothing has to be decremented when an entry expires.
+#   KEYS: cluster hash, resource type index, compressed index
+#   ARGV: ttl, cluster id, resource type, payload ('' to skip sending it),
+#         ts field, update time, raw field, uncompressed size ('' if stored raw),
+#         digest field, payload digest, expiry time (ms)
+CACHE_WRITE_SCRIPT = """
+local ttl = tonumber(ARGV[1])
+local expires = tonumber(ARGV[11])
+if ARGV[4] == '' then
+    -- Payload believed unchanged: only refresh the timestamp if the stored
+    -- copy has the same digest. Any other writer may have replaced it, so
+    -- otherwise ask for the full payload.
+    if redis.call('HGET', KEYS[1], ARGV[9]) ~= ARGV[10]
+            or redis.call('HEXISTS', KEYS[1], ARGV[3]) == 0 then
+        return -1
+    end
+    redis.call('HSET', KEYS[1], ARGV[5], ARGV[6])
+    redis.call('ZADD', KEYS[3], 'XX', expires, ARGV[2])
+else
+    redis.call('HSET', KEYS[1], ARGV[3], ARGV[4], ARGV[5], ARGV[6], ARGV[9], ARGV[10])
+    if ARGV[8] ~= '' then
+        redis.call('HSET', KEYS[1], ARGV[7], ARGV[8])
+        redis.call('ZADD', KEYS[3], expires, ARGV[2])
+    else
+        redis.call('HDEL', KEYS[1], ARGV[7])
+        redis.call('ZREM', KEYS[3], ARGV[2])
+    end
+end
+redis.call('EXPIRE', KEYS[1], ttl)
+local added = redis.call('ZADD', KEYS[2], expires, ARGV[2])
+-- Drop expired members so the index sets stay bounded
+local now = expires - ttl * 1000
+for i = 2, 3 do
+    redis.call('ZREMRANGEBYSCORE', KEYS[i], '-inf', now)
+    redis.call('EXPIRE', KEYS[i], ttl)
+end
+return added
+"""
+# Calls are sent with EVALSHA so pipelined writes don't resend the script
+# body. redis-py's Script objects would issue SCRIPT EXISTS before every
+# pipeline instead; here the script is only sent with EVAL when Redis
+# answers NOSCRIPT (e.g. after a restart or SCRIPT FLUSH), which caches it
+# again.
+CACHE_WRITE_SHA = hashlib.sha1(CACHE_WRITE_SCRIPT.encode()).hexdigest()
+
+# Digests of the payloads this process last wrote, so unchanged lists (the
+# common case for stable inventories) are not re-sent on every sync. This is
+# only a hint: the script compares against the digest stored with the entry.
+_write_digests = cachetools.TTLCache(maxsize=4096, ttl=CACHE_TTL)
+_write_digests_lock = threading.Lock()
+
+def _payload_digest(payload):
+    """Short digest of a serialized payload."""
+    return hashlib.blake2b(payload, digest_size=8).digest()
+
+def _queue_cache_write(pipe, cluster_id, resource_type, payload, compressed, raw_size, creds_hash, digest,
+                       send_script=False):
+    """Queue the atomic write script for one cache entry (1 reply)."""
+    now = time.time_ns()
+    if send_script:
+        command, script = pipe.eval, CACHE_WRITE_SCRIPT
+    else:
+        command, script = pipe.evalsha, CACHE_WRITE_SHA
+    command(
+        script, 3,
+        get_cluster_cache_key(cluster_id, creds_hash),
+        _index_key(creds_hash, resource_type),
+        _compressed_index_key(creds_hash, resource_type),
+        CACHE_TTL,
+        cluster_id,
+        resource_type, payload,
+        _ts_field(resource_type), now,
+        # Uncompressed size, used for compression ratio stats
+        _raw_field(resource_type), raw_size if compressed else '',
+        _digest_field(resource_type), digest,
+        now // 1_000_000 + CACHE_TTL * 1000,
+    )
+
+def _execute_cache_writes(pipe, queue_writes):
+    """
+    Queue and execute script calls, resending them with EVAL if Redis lost the script.
+    
+    Args:
+        pipe: Redis pipeline
+        queue_writes: Callable taking send_script that queues the commands
+    """
+    queue_writes(False)
+    try:
+        return pipe.execute()
+    except redis.exceptions.NoScriptError:
+        # The write script is idempotent, so calls that did run before the
+        # error are safe to repeat
+        logger.debug("Cache write script not loaded in Redis, sending it with EVAL")
+        queue_writes(True)
+        return pipe.execute()
+
+@retry_redis()
+def _send_cache_writes(r, written):
+    """Pipeline the writes for serialized entries and return the replies."""
+    digests = [_payload_digest(payload) for _, (_, payload, _) in written]
+    with _write_digests_lock:
+        unchanged = [_write_digests.get((entry[0], entry[1], entry[3])) == digest
+                     for (entry, _), digest in zip(written, digests)]
+    
+    with r.pipeline(transaction=False) as pipe:
+        def queue_writes(send_script):
+            for ((cluster_id, resource_type, _, creds_hash), (compressed, payload, raw_size)), digest, skip in zip(written, digests, unchanged):
+                _queue_cache_write(pipe, cluster_id, resource_type, b'' if skip else payload,
+                                   compressed, raw_size, creds_hash, digest, send_script)
+            # The credentials index lives in its own slot, so it is updated
+            # alongside the script rather than from inside it
+            pipe.sadd(CREDS_INDEX_KEY, *{entry[3] for entry, _ in written})
+        replies = _execute_cache_writes(pipe, queue_writes)[:-1]
+        
+        # Entries whose stored copy was missing or changed are sent again in full
+        missing = [i for i, reply in enumerate(replies) if reply == -1]
+        if missing:
+            def queue_resends(send_script):
+                for i in missing:
+                    (cluster_id, resource_type, _, creds_hash), (compressed, payload, raw_size) = written[i]
+                    _queue_cache_write(pipe, cluster_id, resource_type, payload, compressed, raw_size,
+                                       creds_hash, digests[i], send_script)
+            for i, reply in zip(missing, _execute_cache_writes(pipe, queue_resends)):
+                replies[i] = reply
+    
+    with _write_digests_lock:
+        for ((cluster_id, resource_type, _, creds_hash), _), digest in zip(written, digests):
+            _write_digests[(cluster_id, resource_type, creds_hash)] = digest
+    return replies
+
+def _write_cache_entries(r, entries):
+    """
+    Write several cache entries in a single pipelined round-trip.
+    
+    Args:
+        r: Redis connection
+        entries: List of (cluster_id, resource_type, resources, creds_hash) tuples
+        
+    Returns:
+        list: Per-entry payload as written to Redis, or None if the entry
+        was not cached
+    """
+    serialized = [_serialize_resources(resource_type, resources)
+                  for _, resource_type, resources, _ in entries]
+    
+    # Entries rejected during serialization are not written
+    written = [(entry, data) for entry, data in zip(entries, serialized) if data is not None]
+    try:
+        if written:
+            _send_cache_writes(r, written)
+    finally:
+        # Evict once Redis has the new values, so a lookup in between can't
+        # refill the local cache with the old ones
+        for cluster_id, resource_type, _, creds_hash in entries:
+            _evict_local(cluster_id, resource_type, creds_hash)
+    
+    # The script either applies a whole entry or raises
+    return [None if data is None else data[1] for data in serialized]
+
 def cache_cluster_resources(cluster_id, resource_type, resources, creds_hash):
     """Cache resources for a specific cluster and resource type with compression support."""
     if not cluster_id or not resource_type or resources is None:
         return False
     
-    # Prune attributes to save memory before caching
-    pruned_resources = prune_resource_attributes(resources, resource_type) if resources else resources
-    
     try:
-        # Generate cache key
-        cache_key = get_cache_key(resource_type, cluster_id, creds_hash)
-        
-        if COMPRESSION_ENABLED:
-            # Use binary connection for compressed data
-            r = get_redis_connection(binary=True)
-            if r is None:
-                return False
-                
-            # Use compressed cache key
-            compressed_key = get_compressed_cache_key(resource_type, cluster_id, creds_hash)
-            
-            # Compress data
-            compressed_data = gzip.compress(
-                pickle.dumps(pruned_resources), 
-                compresslevel=COMPRESSION_LEVEL
-            )
-            
-            # Store with expiration
-            result = r.set(compressed_key, compressed_data, ex=CACHE_TTL)
-            
-            if result:
-                logger.debug(f"Cached {len(resources)} {resource_type} for cluster {cluster_id} (compressed)")
-        else:
-            # Use regular text connection for JSON
-            r = get_redis_connection()
-            if r is None:
-                return False
-                
-            # Serialize resources to JSON
-            json_data = json.dumps(pruned_resources)
-            
-            # Store with expiration
-            result = r.set(cache_key, json_data, ex=CACHE_TTL)
-            
-            if result:
-                logger.debug(f"Cached {len(resources)} {resource_type} for cluster {cluster_id}")
-        
-        if result:
-            # Update index of cluster IDs with cached resources (use text connection)
-            r_text = get_redis_connection() if COMPRESSION_ENABLED else r
-            index_key = f"{CACHE_PREFIX}{creds_hash}:clusters_with_{resource_type}"
-            r_text.sadd(index_key, cluster_id)
-            r_text.expire(index_key, CACHE_TTL)
-            
-            # Update timestamp index
-            ts_key = f"{CACHE_PREFIX}{creds_hash}:last_update:{resource_type}:{cluster_id}"
-            r_text.set(ts_key, datetime.now().isoformat(), ex=CACHE_TTL)
+        r = get_redis_connection()
+        if r is None:
+            return False
         
-        return result
+        payload = _write_cache_entries(r, [(cluster_id, resource_type, resources, creds_hash)])[0]
+        if payload is None:
+            return False
+        
+        # Small lists are stored uncompressed even with compression enabled
+        logger.debug(f"Cached {len(resources)} {resource_type} for cluster {cluster_id}"
+                     + (" (compressed)" if payload[:1] in (ZSTD_PAYLOAD, GZIP_PAYLOAD) else ""))
+        return True
     except Exception as e:
         logger.error(f"Error caching {resource_type} for cluster {cluster_id}: {str(e)}")
         return False
 
+def cache_many_cluster_resources(entries):
+    """
+    Cache resources for several clusters in one Redis round-trip.
+    
+    Args:
+        entries: List of (cluster_id, resource_type, resources, creds_hash) tuples
+        
+    Returns:
+        int: Number of entries successfully cached
+    """
+    entries = [entry for entry in entries
+               if entry[0] and entry[1] and entry[2] is not None]
+    if not entries:
+        return 0
+    
+    try:
+        r = get_redis_connection()
+        if r is None:
+            return 0
+        
+        cached = sum(1 for payload in _write_cache_entries(r, entries) if payload is not None)
+        logger.debug(f"Cached {cached} resource lists in one pipeline")
+        return cached
+    except Exception as e:
+        logger.error(f"Error caching batch of {len(entries)} resource lists: {str(e)}")
+        return 0
+
+# In-flight loads by key, so concurrent cache misses share one vSphere fetch
+_inflight = {}
+_inflight_lock = threading.Lock()
+
+class _Flight:
+    """A load in progress and, once finished, its result."""
+    
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.failed = False
+
+def load_or_wait(key, loader, timeout=30.0):
+    """
+    Run `loader` once for concurrent callers asking for the same key.
+    
+    The first caller runs the loader; callers arriving while it is running
+    wait for it and receive the same result. If the load fails or takes
+    longer than `timeout`, waiting callers run the loader themselves.
+    
+    Args:
+        key: Hashable key identifying the load, e.g. (cluster_id, creds_hash)
+        loader: Callable taking no arguments that fetches (and caches) the data
+        timeout (float): Seconds to wait for an in-flight load
+        
+    Returns:
+        The loader's result
+    """
+    with _inflight_lock:
+        flight = _inflight.get(key)
+        leader = flight is None
+        if leader:
+            flight = _inflight[key] = _Flight()
+    
+    if not leader:
+        if flight.done.wait(timeout) and not flight.failed:
+            logger.debug(f"Shared in-flight load for {key}")
+            return flight.result
+        logger.debug(f"In-flight load for {key} failed or timed out, loading directly")
+        return loader()
+    
+    try:
+        flight.result = loader()
+        return flight.result
+    except Exception:
+        flight.failed = True
+        raise
+    finally:
+        with _inflight_lock:
+            _inflight.pop(key, None)
+        flight.done.set()
+
 def get_cached_cluster_resources(cluster_id, resource_type, creds_hash):
     """Get cached resources for a specific cluster and resource type with compression support."""
     if not cluster_id or not resource_type:
         return None
     
+    return get_cached_cluster_resources_bulk(cluster_id, [resource_type], creds_hash)[resource_type]
+
+def get_cached_cluster_resources_bulk(cluster_id, resource_types, creds_hash):
+    """
+    Get cached resources of several types for a cluster in one Redis round-trip.
+    
+    Args:
+        cluster_id: Cluster ID
+        resource_types: Resource types to fetch
+        creds_hash: Credentials hash
+        
+    Returns:
+        dict: Resource type -> list of resources, or None on a cache miss
+    """
+    results = {}
+    missing = []
+    
+    with _local_cache_lock:
+        epoch = _local_epoch
+        for resource_type in resource_types:
+            data = _local_cache.get((cluster_id, resource_type, creds_hash))
+            if data is None:
+                missing.append(resource_type)
+            else:
+                results[resource_type] = data
+    
+    # Decode outside the lock; every hit gets its own copy
+    for resource_type, data in results.items():
+        results[resource_type] = None if data is _CACHE_MISS else _DEC.decode(data)
+    
+    if results:
+        logger.debug(f"Local cache answered {len(results)} resource types for cluster {cluster_id}")
+    if not missing:
+        return results
+    
+    fetched = _get_cached_cluster_resources_from_redis(cluster_id, missing, creds_hash)
+    with _local_cache_lock:
+        # Values read while a write was in progress may already be stale
+        if epoch == _local_epoch:
+            for resource_type, data in fetched.items():
+                _local_cache[(cluster_id, resource_type, creds_hash)] = (
+                    _CACHE_MISS if data is None else data)
+    for resource_type, data in fetched.items():
+        results[resource_type] = None if data is None else _DEC.decode(data)
+    return results
+
+def _encode_json_payload(data):
+    """Compress serialized JSON when large enough to be worth it."""
+    if COMPRESSION_ENABLED and len(data) >= COMPRESSION_MIN_BYTES:
+        if COMPRESSION_CODEC == 'gzip':
+            return GZIP_PAYLOAD + gzip.compress(data, compresslevel=COMPRESSION_LEVEL)
+        return ZSTD_PAYLOAD + _zstd_compressor().compress(data)
+    return data
+
+def get_cached_json(key):
+    """
+    Get a JSON value cached under a plain Redis key (e.g. datacenter lists).
+    
+    The JSON text is kept briefly in the in-process cache, so repeated
+    dropdown requests skip the Redis round-trip and decompression. Each
+    call parses its own copy of the value.
+    
+    Args:
+        key: Redis key
+        
+    Returns:
+        The decoded value, or None on a cache miss or error
+    """
+    local_key = (key, 'json', None)
+    with _local_cache_lock:
+        epoch = _local_epoch
+        data = _local_cache.get(local_key)
+    if data is not None:
+        return None if data is _CACHE_MISS else orjson.loads(data)
+    
     try:
-        # First try to get compressed data if compression is enabled
-        if COMPRESSION_ENABLED:
-            # Get binary connection for compressed data
-            r_bin = get_redis_connection(binary=True)
-            if r_bin is not None:
-                # Get compressed data
-                compressed_key = get_compressed_cache_key(resource_type, cluster_id, creds_hash)
-                compressed_data = r_bin.get(compressed_key)
-                
-                if compressed_data:
-                    # Decompress and deserialize
-                    resources = pickle.loads(gzip.decompress(compressed_data))
-                    logger.debug(f"Compressed cache hit: {len(resources)} {resource_type} for cluster {cluster_id}")
-                    return resources
-        
-        # Fall back to uncompressed JSON if no compressed data or compression disabled
         r = get_redis_connection()
         if r is None:
             return None
+        payload = r.get(key)
+        # JSON text never starts with a format byte, so plain values
+        # written before compression was added still decode
+        data = _decompress_payload(payload) if payload else None
+        value = orjson.loads(data) if data else None
+    except Exception as e:
+        logger.warning(f"Error reading cached value {key}: {str(e)}")
+        return None
+    
+    with _local_cache_lock:
+        if epoch == _local_epoch:
+            _local_cache[local_key] = _CACHE_MISS if data is None else data
+    return value
+
+def cache_json(key, value, ttl=CACHE_TTL):
+    """
+    Cache a JSON-serializable value under a plain Redis key.
+    
+    Args:
+        key: Redis key
+        value: Value to store
+        ttl (int): Expiry in seconds
         
-        # Generate cache key
-        cache_key = get_cache_key(resource_type, cluster_id, creds_hash)
-        
-        # Get cached data
-        json_data = r.get(cache_key)
+    Returns:
+        bool: True if the value was stored
+    """
+    try:
+        r = get_redis_connection()
+        if r is None:
+            return False
+        data = orjson.dumps(value)
+        r.set(key, _encode_json_payload(data), ex=ttl)
+    except Exception as e:
+        logger.warning(f"Error caching value {key}: {str(e)}")
+        return False
+    
+    global _local_epoch
+    with _local_cache_lock:
+        _local_epoch += 1
+        _local_cache[(key, 'json', None)] = data
+    return True
+
+@retry_redis()
+def _fetch_payloads(r, cluster_id, resource_types, creds_hash):
+    """Fetch cached payloads and their update times in one round-trip."""
+    fields = []
+    for resource_type in resource_types:
+        fields.append(resource_type)
+        fields.append(_ts_field(resource_type))
+    values = r.hmget(get_cluster_cache_key(cluster_id, creds_hash), fields)
+    return zip(values[0::2], values[1::2])
+
+def _get_cached_cluster_resources_from_redis(cluster_id, resource_types, creds_hash):
+    """Read cached resource lists from Redis as uncompressed MessagePack. Misses map to None."""
+    results = dict.fromkeys(resource_types)
+    try:
+        r = get_redis_connection()
+        if r is None:
+            return results
         
-        if json_data:
-            # Deserialize and return
-            resources = json.loads(json_data)
-            logger.debug(f"Cache hit: {len(resources)} {resource_type} for cluster {cluster_id}")
-            return resources
-        else:
-            logger.debug(f"Cache miss: {resource_type} for cluster {cluster_id}")
-            return None
+        now = time.time_ns()
+        for resource_type, (payload, updated) in zip(
+                resource_types, _fetch_payloads(r, cluster_id, resource_types, creds_hash)):
+            # The hash TTL is refreshed by writes of any resource type, so check
+            # this type's own age as well
+            if payload and updated:
+                if not updated.isdigit() or now - int(updated) > CACHE_TTL_NS:
+                    payload = None
+            
+            if payload:
+                data = _decompress_payload(payload)
+                logger.debug(f"Cache hit: {resource_type} for cluster {cluster_id} ({len(data)} bytes)")
+                results[resource_type] = data
+            else:
+                logger.debug(f"Cache miss: {resource_type} for cluster {cluster_id}")
     except Exception as e:
-        logger.error(f"Error retrieving cached {resource_type} for cluster {cluster_id}: {str(e)}")
-        return None
+        logger.error(f"Error retrieving cached {', '.join(resource_types)} for cluster {cluster_id}: {str(e)}")
+    return results
+
+@retry_redis()
+def _unlink_cluster(r, cluster_id, creds_hash):
+    """Remove a cluster's cached resources and return the hash field names."""
+    # A cluster's resources live in one hash, so a single non-blocking
+    # UNLINK clears them
+    cluster_key = get_cluster_cache_key(cluster_id, creds_hash)
+    # MULTI keeps a concurrent write from re-indexing the cluster between
+    # the UNLINK and the index removals (all keys share the {creds} slot)
+    pipe = r.pipeline(transaction=True)
+    pipe.hkeys(cluster_key)
+    pipe.unlink(cluster_key)
+    for resource_type in RESOURCE_TYPES:
+        pipe.zrem(_index_key(creds_hash, resource_type), cluster_id)
+        pipe.zrem(_compressed_index_key(creds_hash, resource_type), cluster_id)
+    return set(map(_decode, pipe.execute()[0]))
 
 def invalidate_cluster_cache(cluster_id, creds_hash=None):
     """Invalidate the cache for a specific cluster."""
@@ -274,42 +859,19 @@ def invalidate_cluster_cache(cluster_id, creds_hash=None):
         if r is None:
             return False
         
-        # If compression is enabled, also get binary connection for compressed data
-        r_bin = get_redis_connection(binary=True) if COMPRESSION_ENABLED else None
-        
-        # If no credentials hash provided, invalidate for all credentials
+        # If no credentials hash provided, invalidate for all known credentials
         if creds_hash is None:
-            # Find all creds hashes with this cluster
-            pattern = f"{CACHE_PREFIX}*:*:{cluster_id}*"  # Include any suffix for compressed keys
-            keys = r.keys(pattern)
-            
-            # Delete all keys
-            if keys:
-                r.delete(*keys)
-                logger.info(f"Invalidated all caches for cluster {cluster_id}")
+            for known_hash in map(_decode, r.smembers(CREDS_INDEX_KEY)):
+                invalidate_cluster_cache(cluster_id, known_hash)
+            _evict_local(cluster_id)
+            logger.info(f"Invalidated all caches for cluster {cluster_id}")
             return True
         
-        # Delete all resource type caches for this cluster
-        deleted = 0
-        for resource_type in RESOURCE_TYPES:
-            # Delete uncompressed cache
-            cache_key = get_cache_key(resource_type, cluster_id, creds_hash)
-            if r.delete(cache_key):
-                deleted += 1
-            
-            # Delete compressed cache if enabled
-            if COMPRESSION_ENABLED and r_bin is not None:
-                compressed_key = get_compressed_cache_key(resource_type, cluster_id, creds_hash)
-                if r_bin.delete(compressed_key):
-                    deleted += 1
-                
-            # Update index
-            index_key = f"{CACHE_PREFIX}{creds_hash}:clusters_with_{resource_type}"
-            r.srem(index_key, cluster_id)
-            
-            # Delete timestamp
-            ts_key = f"{CACHE_PREFIX}{creds_hash}:last_update:{resource_type}:{cluster_id}"
-            r.delete(ts_key)
+        fields = _unlink_cluster(r, cluster_id, creds_hash)
+        # Evict after the unlink, so a lookup in between can't refill the
+        # local cache with the old values
+        _evict_local(cluster_id, creds_hash=creds_hash)
+        deleted = sum(1 for resource_type in RESOURCE_TYPES if resource_type in fields)
         
         logger.info(f"Invalidated {deleted} resource caches for cluster {cluster_id}")
         return True
@@ -319,6 +881,14 @@ def invalidate_cluster_cache(cluster_id, creds_hash=None):
 
 def get_cache_stats(creds_hash=None):
     """Get statistics about the cached data."""
+    # Polled by status pages; reuse a recent result rather than running
+    # the stats pipelines (and INFO) on every request
+    local_key = ('cache_stats', 'stats', creds_hash)
+    with _local_cache_lock:
+        data = _local_cache.get(local_key)
+    if data is not None:
+        return orjson.loads(data)
+    
     try:
         r = get_redis_connection()
         if r is None:
@@ -331,90 +901,76 @@ def get_cache_stats(creds_hash=None):
             'compression_ratio': {}
         }
         
-        # Get all keys
-        pattern = f"{CACHE_PREFIX}*" if creds_hash is None else f"{CACHE_PREFIX}{creds_hash}:*"
-        all_keys = r.keys(pattern)
-        stats['total_keys'] = len(all_keys)
+        # The index sets are scored by expiry time, so live entries are
+        # counted with ZCOUNT rather than by walking the keyspace or entries
+        creds_hashes = [creds_hash] if creds_hash else sorted(map(_decode, r.smembers(CREDS_INDEX_KEY)))
+        now = time.time_ns() // 1_000_000
+        
+        # Counts, ratio samples and memory info in one round trip
+        pipe = r.pipeline(transaction=False)
+        for known_hash in creds_hashes:
+            for resource_type in RESOURCE_TYPES:
+                pipe.zcount(_index_key(known_hash, resource_type), now, '+inf')
+                compressed_key = _compressed_index_key(known_hash, resource_type)
+                pipe.zcount(compressed_key, now, '+inf')
+                pipe.zrangebyscore(compressed_key, now, '+inf', start=0, num=5)
+        pipe.info('memory')
+        # INFO may be disabled on managed Redis; don't let it fail the whole batch
+        replies = pipe.execute(raise_on_error=False)
+        memory_info = replies.pop()
+        replies = iter(replies)
+        
+        counts = {resource_type: [0, 0] for resource_type in RESOURCE_TYPES}  # total, compressed
+        samples = {resource_type: [] for resource_type in RESOURCE_TYPES}
+        for known_hash in creds_hashes:
+            for resource_type in RESOURCE_TYPES:
+                counts[resource_type][0] += next(replies)
+                counts[resource_type][1] += next(replies)
+                samples[resource_type].extend(
+                    (known_hash, _decode(cluster_id)) for cluster_id in next(replies))
+        
+        # Sample a few compressed entries per type to estimate the
+        # compression ratio, fetching sizes for every type in one pipeline
+        sampled = [(resource_type, known_hash, cluster_id)
+                   for resource_type in RESOURCE_TYPES
+                   for known_hash, cluster_id in samples[resource_type][:5]]
+        sizes = {resource_type: [] for resource_type in RESOURCE_TYPES}
+        if sampled:
+            pipe = r.pipeline(transaction=False)
+            for resource_type, known_hash, cluster_id in sampled:
+                cluster_key = get_cluster_cache_key(cluster_id, known_hash)
+                pipe.hstrlen(cluster_key, resource_type)
+                pipe.hget(cluster_key, _raw_field(resource_type))
+            replies = iter(pipe.execute())
+            for resource_type, _, _ in sampled:
+                size, raw_size = next(replies), next(replies)
+                if size and raw_size:
+                    sizes[resource_type].append((size, int(raw_size)))
         
-        # Count by resource type and estimate memory usage
+        stats['clusters'] = {}
         for resource_type in RESOURCE_TYPES:
-            # Count uncompressed keys
-            type_pattern = f"{CACHE_PREFIX}*:{resource_type}:*"
-            if COMPRESSION_ENABLED:
-                # Exclude compressed keys
-                type_pattern = f"{CACHE_PREFIX}*:{resource_type}:[^:]*$"  # Exclude keys with more segments
-            type_keys = r.keys(type_pattern)
-            uncompressed_count = len(type_keys)
-            
-            # Count compressed keys if enabled
-            compressed_count = 0
-            if COMPRESSION_ENABLED:
-                compressed_pattern = f"{CACHE_PREFIX}*:{resource_type}:*:compressed"
-                compressed_keys = r.keys(compressed_pattern)
-                compressed_count = len(compressed_keys)
-                
-                # Sample a few keys to estimate compression ratio
-                if compressed_keys and len(compressed_keys) > 0:
-                    # Get size of a sample of compressed vs uncompressed
-                    sample_size = min(5, len(compressed_keys))
-                    compressed_sizes = []
-                    uncompressed_sizes = []
-                    
-                    for i in range(sample_size):
-                        compressed_key = compressed_keys[i]
-                        # Extract the uncompressed key
-                        uncompressed_key = compressed_key.rsplit(':', 1)[0]
-                        
-                        # Get compressed size
-                        compressed_data = r.get(compressed_key)
-                        if compressed_data:
-                            compressed_sizes.append(len(compressed_data))
-                        
-                        # Get uncompressed size if available
-                        uncompressed_data = r.get(uncompressed_key)
-                        if uncompressed_data:
-                            uncompressed_sizes.append(len(uncompressed_data))
-                    
-                    # Calculate average ratio if we have both sizes
-                    if compressed_sizes and uncompressed_sizes:
-                        avg_compressed = sum(compressed_sizes) / len(compressed_sizes)
-                        avg_uncompressed = sum(uncompressed_sizes) / len(uncompressed_sizes)
-                        if avg_uncompressed > 0:
-                            ratio = avg_compressed / avg_uncompressed
-                            stats['compression_ratio'][resource_type] = ratio
+            total_count, compressed_count = counts[resource_type]
+            stats['total_keys'] += total_count
             
             # Update stats
-            stats['resource_types'][resource_type] = uncompressed_count + compressed_count
+            stats['resource_types'][resource_type] = total_count
+            stats['clusters'][resource_type] = total_count
             stats['memory_usage'][resource_type] = {
-                'uncompressed_keys': uncompressed_count,
+                'uncompressed_keys': total_count - compressed_count,
                 'compressed_keys': compressed_count
             }
-        
-        # Get cluster counts
-        stats['clusters'] = {}
-        for resource_type in RESOURCE_TYPES:
-            if creds_hash:
-                index_key = f"{CACHE_PREFIX}{creds_hash}:clusters_with_{resource_type}"
-                cluster_ids = r.smembers(index_key)
-                stats['clusters'][resource_type] = len(cluster_ids)
-            else:
-                # More complex with multiple credential hashes
-                cluster_pattern = f"{CACHE_PREFIX}*:{resource_type}:*"
-                cluster_keys = r.keys(cluster_pattern)
-                
-                # Count unique clusters from keys
-                unique_clusters = set()
-                for key in cluster_keys:
-                    parts = key.split(':')
-                    if len(parts) >= 4:  # prefix:creds:type:cluster_id[:compressed]
-                        cluster_id = parts[3]
-                        unique_clusters.add(cluster_id)
-                
-                stats['clusters'][resource_type] = len(unique_clusters)
+            
+            # Average compression ratio over the sampled entries
+            if sizes[resource_type]:
+                avg_compressed = sum(size for size, _ in sizes[resource_type]) / len(sizes[resource_type])
+                avg_uncompressed = sum(raw for _, raw in sizes[resource_type]) / len(sizes[resource_type])
+                if avg_uncompressed > 0:
+                    stats['compression_ratio'][resource_type] = avg_compressed / avg_uncompressed
         
         # Get Redis memory stats if available
-        try:
-            memory_info = r.info('memory')
+        if isinstance(memory_info, Exception):
+            logger.debug(f"Could not get Redis memory info: {str(memory_info)}")
+        else:
             stats['redis'] = {
                 'used_memory': memory_info.get('used_memory_human', 'unknown'),
                 'used_memory_peak': memory_info.get('used_memory_peak_human', 'unknown'),
@@ -422,9 +978,9 @@ def get_cache_stats(creds_hash=None):
                 'maxmemory': memory_info.get('maxmemory_human', 'unlimited'),
                 'maxmemory_policy': memory_info.get('maxmemory_policy', 'unknown')
             }
-        except Exception as mem_error:
-            logger.debug(f"Could not get Redis memory info: {str(mem_error)}")
         
+        with _local_cache_lock:
+            _local_cache[local_key] = orjson.dumps(stats)
         return stats
     except Exception as e:
         logger.error(f"Error getting cache stats: {str(e)}")
@@ -437,130 +993,228 @@ def clear_all_cache():
         if r is None:
             return False
         
-        # Find all keys with our prefix
+        # Find all keys with our prefix and delete them in pipelined batches
         pattern = f"{CACHE_PREFIX}*"
-        keys = r.keys(pattern)
-        
-        # Delete all keys if any exist
-        if keys:
-            # Delete in batches to avoid blocking Redis for too long
-            batch_size = 100
-            for i in range(0, len(keys), batch_size):
-                batch = keys[i:i+batch_size]
-                r.delete(*batch)
-                logger.debug(f"Deleted batch of {len(batch)} keys")
-            
-            logger.info(f"Cleared {len(keys)} vSphere cache entries from Redis")
-            return True
+        try:
+            deleted = delete_keys(r, scan_keys(r, pattern))
+        finally:
+            # Clear after the delete, so a lookup in between can't refill
+            # the local cache with the old values
+            _clear_local()
+        
+        if deleted:
+            logger.info(f"Cleared {deleted} vSphere cache entries from Redis")
         else:
             logger.info("No vSphere cache entries found to clear")
-            return True
+        return True
     except Exception as e:
         logger.error(f"Error clearing Redis cache: {str(e)}")
         return False
 
+# Performance tracking settings
+PERF_SAMPLE_RATE = int(os.environ.get('VSPHERE_PERF_SAMPLE_RATE', '10'))  # Record 1 in N calls
+PERF_HISTORY_SIZE = 100  # Measurements kept per function
+PERF_FLUSH_BATCH = 200  # Measurements written per Redis pipeline
+
+# Measurements are handed to a background writer so timed calls never wait on
+# Redis. The writer starts with the first measurement and is stopped, after
+# writing what is still queued, by flush_perf_metrics() at exit.
+_perf_queue = queue.Queue(maxsize=10000)
+_perf_thread = None
+_perf_thread_lock = threading.Lock()
+_PERF_STOP = object()  # Queued to stop the writer once it has drained the queue
+
+def _write_perf_batch(batch):
+    """Write a batch of measurements to Redis in one pipeline."""
+    # Group by sorted set so each key gets one ZADD/trim/EXPIRE
+    by_key = {}
+    for perf_key, member, elapsed_ns in batch:
+        by_key.setdefault(perf_key, {})[member] = elapsed_ns
+    
+    try:
+        r = get_redis_connection()
+        if r:
+            # Sorted set of measurements, scored by elapsed nanoseconds
+            with r.pipeline(transaction=False) as pipe:
+                for perf_key, measurements in by_key.items():
+                    pipe.zadd(perf_key, measurements)
+                    pipe.zremrangebyrank(perf_key, 0, -(PERF_HISTORY_SIZE + 1))
+                    pipe.expire(perf_key, 86400)  # 24 hours
+                pipe.execute()
+    except Exception as e:
+        logger.debug(f"Could not record performance metrics: {str(e)}")
+
+def _perf_writer():
+    """Drain queued measurements and write them to Redis in batches until stopped."""
+    while True:
+        batch = [_perf_queue.get()]
+        while len(batch) < PERF_FLUSH_BATCH:
+            try:
+                batch.append(_perf_queue.get_nowait())
+            except queue.Empty:
+                break
+        
+        stopping = any(item is _PERF_STOP for item in batch)
+        if stopping:
+            batch = [item for item in batch if item is not _PERF_STOP]
+        if batch:
+            _write_perf_batch(batch)
+        if stopping:
+            return
+
+def _record_perf(perf_key, elapsed_ns):
+    """Queue a measurement for the background writer, starting it if needed."""
+    global _perf_thread
+    try:
+        _perf_queue.put_nowait((perf_key, str(time.time_ns()), elapsed_ns))
+    except queue.Full:
+        # Drop the measurement rather than slow down the caller
+        return
+    
+    if _perf_thread is None:
+        with _perf_thread_lock:
+            if _perf_thread is None:
+                _perf_thread = threading.Thread(target=_perf_writer, daemon=True, name='perf-writer')
+                _perf_thread.start()
+
+def flush_perf_metrics(timeout=5.0):
+    """
+    Write queued measurements to Redis and stop the background writer.
+    
+    Runs at exit from shutdown(); a later measurement starts a new writer.
+    
+    Args:
+        timeout (float): Seconds to wait for the queue to be written
+    """
+    global _perf_thread
+    with _perf_thread_lock:
+        thread, _perf_thread = _perf_thread, None
+    if thread is None:
+        return
+    
+    try:
+        _perf_queue.put(_PERF_STOP, timeout=timeout)
+    except queue.Full:
+        logger.debug("Performance metrics queue full, stopping writer without flushing")
+    thread.join(timeout)
+
 # Performance tracking decorator
 def timeit(func):
     """Decorator to time function execution and log performance."""
+    perf_key = f"{CACHE_PREFIX}perf:{func.__name__}"
+    # Counted per function so rarely called functions are still sampled
+    calls = itertools.count()
+    
     @functools.wraps(func)
     def wrapper(*args, **kwargs):
-        start_time = time.time()
+        start_ns = time.perf_counter_ns()
         result = func(*args, **kwargs)
-        elapsed_time = time.time() - start_time
-        logger.debug(f"{func.__name__} took {elapsed_time:.2f} seconds")
+        elapsed_ns = time.perf_counter_ns() - start_ns
+        logger.debug(f"{func.__name__} took {elapsed_ns / 1e9:.2f} seconds")
         
-        # Store performance metrics in Redis for monitoring
-        try:
-            r = get_redis_connection()
-            if r:
-                # Build a key based on the function name
-                perf_key = f"{CACHE_PREFIX}perf:{func.__name__}"
-                
-                # Store as a sorted set with time as score
-                r.zadd(perf_key, {datetime.now().isoformat(): elapsed_time})
-                
-                # Keep only the last 100 measurements
-                r.zremrangebyrank(perf_key, 0, -101)
-                
-                # Set expiration
-                r.expire(perf_key, 86400)  # 24 hours
-        except Exception:
-            # Don't let Redis errors affect the function execution
-            pass
+        # Store a sample of performance metrics in Redis for monitoring
+        if next(calls) % PERF_SAMPLE_RATE == 0:
+            _record_perf(perf_key, elapsed_ns)
             
         return result
     return wrapper
 
 # Background Template Loader
+TEMPLATE_WORKERS = int(os.environ.get('VSPHERE_TEMPLATE_WORKERS', '4'))
+
 class TemplateLoader:
     """Handles loading VM templates in the background to avoid timeouts."""
     
-    def __init__(self):
+    def __init__(self, max_workers=TEMPLATE_WORKERS):
         """Initialize the template loader."""
-        self.queue = queue.Queue()
-        self.worker = None
         self.lock = threading.RLock()
         self.running = True
         
-        # Start worker thread
-        self.worker = threading.Thread(target=self._worker_thread, daemon=True)
-        self.worker.start()
+        # vSphere fetches are I/O bound, so clusters load in parallel
+        self.pool = concurrent.futures.ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix='template-loader')
+        
+        self._futures = set()
+        
+        # Load queued or running per (cluster, credentials), so repeat
+        # requests for the same cluster coalesce instead of fetching twice
+        self._loading = {}
         
-        logger.info("Template loader initialized")
+        logger.info(f"Template loader initialized with {max_workers} workers")
     
     def start_loading_templates(self, cluster_id, cluster_obj, instance, creds_hash):
         """Queue a template loading task for a cluster."""
-        self.queue.put((cluster_id, cluster_obj, instance, creds_hash))
+        with self.lock:
+            if not self.running:
+                logger.warning(f"Template loader shut down, skipping cluster {cluster_id}")
+                return
+            key = (cluster_id, creds_hash)
+            duplicate = key in self._loading
+            if not duplicate:
+                future = self.pool.submit(self._do_load, cluster_id, cluster_obj, instance, creds_hash)
+                self._futures.add(future)
+                self._loading[key] = future
+        
+        if duplicate:
+            logger.debug(f"Template loading already queued for cluster {cluster_id}")
+            return
+        
+        future.add_done_callback(functools.partial(self._task_finished, key))
         logger.debug(f"Queued template loading for cluster {cluster_id}")
     
-    def _worker_thread(self):
-        """Worker thread that processes template loading tasks."""
-        while self.running:
-            try:
-                # Get a task from the queue with a timeout
-                task = self.queue.get(timeout=1.0)
-                
-                # Process the task
-                cluster_id, cluster_obj, instance, creds_hash = task
-                
-                try:
-                    logger.info(f"Background loading templates for cluster {cluster_id}")
-                    start_time = time.time()
-                    
-                    # Get templates
-                    templates = instance.get_templates_by_cluster(cluster_obj)
-                    
-                    # Cache the templates
-                    cache_cluster_resources(cluster_id, 'templates', templates, creds_hash)
-                    
-                    elapsed_time = time.time() - start_time
-                    logger.info(f"Background loaded {len(templates)} templates for cluster {cluster_id} in {elapsed_time:.2f}s")
-                    
-                    # Disconnect from vSphere when done with this task
-                    instance.disconnect()
-                    
-                except Exception as e:
-                    logger.error(f"Error in background template loading for cluster {cluster_id}: {str(e)}")
-                    # Still try to disconnect
-                    try:
-                        instance.disconnect()
-                    except Exception:
-                        pass
-                
-                # Mark task as done
-                self.queue.task_done()
-                
-            except queue.Empty:
-                # No tasks, continue waiting
-                continue
-            except Exception as e:
-                logger.exception(f"Unexpected error in template loader worker: {str(e)}")
-    
-    def shutdown(self):
-        """Shutdown the template loader."""
-        self.running = False
-        if self.worker and self.worker.is_alive():
-            self.worker.join(timeout=2.0)
+    def _do_load(self, cluster_id, cluster_obj, instance, creds_hash):
+        """
+        Load and cache templates for a single cluster.
+        
+        The task holds its own session reference for the duration of the
+        load, so callers release theirs as soon as they have queued it.
+        """
+        if not instance.connect():
+            logger.error(f"Failed to connect to vSphere for template loading of cluster {cluster_id}")
+            return
+        
+        try:
+            logger.info(f"Background loading templates for cluster {cluster_id}")
+            start_time = time.time()
+            
+            # Get templates
+            templates = instance.get_templates_by_cluster(cluster_obj)
+            
+            # Cache the templates
+            cache_cluster_resources(cluster_id, 'templates', templates, creds_hash)
+            
+            elapsed_time = time.time() - start_time
+            logger.info(f"Background loaded {len(templates)} templates for cluster {cluster_id} in {elapsed_time:.2f}s")
+        except Exception as e:
+            logger.error(f"Error in background template loading for cluster {cluster_id}: {str(e)}")
+        finally:
+            instance.disconnect()
+    
+    def _task_finished(self, key, future):
+        """Forget a completed (or cancelled) task."""
+        with self.lock:
+            self._futures.discard(future)
+            if self._loading.get(key) is future:
+                del self._loading[key]
+    
+    def shutdown(self, timeout=2.0):
+        """
+        Shutdown the template loader.
+        
+        Queued tasks are cancelled and in-flight loads get up to `timeout`
+        seconds to finish. vSphere sockets carry the connection timeout set in
+        connect(), so a hung fetch cannot hold exit indefinitely.
+        """
+        with self.lock:
+            self.running = False
+            in_flight = list(self._futures)
+        
+        self.pool.shutdown(wait=False, cancel_futures=True)
+        _, not_done = concurrent.futures.wait(in_flight, timeout=timeout)
+        
+        if not_done:
+            logger.warning(f"Template loader shut down with {len(not_done)} loads still running")
+        else:
             logger.info("Template loader shut down")
 
 # Create template loader singleton
@@ -573,11 +1227,14 @@ def shutdown():
     # Shutdown template loader
     template_loader.shutdown()
     
+    # Write queued performance measurements while Redis is still connected
+    flush_perf_metrics()
+    
     # Close Redis connection pool
-    global _redis_pool
-    if _redis_pool:
-        _redis_pool.disconnect()
-        _redis_pool = None
+    global _redis_client
+    if _redis_client:
+        _redis_client.connection_pool.disconnect()
+        _redis_client = None
 
 atexit.register(shutdown)
 
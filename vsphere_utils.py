@@ -102,3 +102,83 @@ def test_vsphere_connection(server, username, password, port=443, timeout=5):
             'message': f'Error connecting to vSphere server: {str(e)}',
             'details': {}
         }
+
+def retrieve_view_properties(content, container, obj_type, path_set, page_size=1000):
+    """
+    Retrieve properties for every object in a container view.
+    
+    Uses the PropertyCollector with a traversal over the view so the
+    requested properties come back in pages of up to `page_size` objects
+    instead of one SOAP call per attribute access.
+    
+    Args:
+        content: vSphere service content
+        container: Container view to traverse
+        obj_type: Managed object type to collect, e.g. vim.VirtualMachine
+        path_set (list): Property paths to retrieve
+        page_size (int): Maximum objects per round-trip
+        
+    Returns:
+        list: (managed object, {property path: value}) tuples
+    """
+    traversal_spec = vim.PropertyCollector.TraversalSpec(
+        name='traverseEntities',
+        path='view',
+        skip=False,
+        type=vim.view.ContainerView
+    )
+    object_spec = vim.PropertyCollector.ObjectSpec(
+        obj=container,
+        skip=True,
+        selectSet=[traversal_spec]
+    )
+    property_spec = vim.PropertyCollector.PropertySpec(
+        type=obj_type,
+        pathSet=path_set,
+        all=False
+    )
+    filter_spec = vim.PropertyCollector.FilterSpec(
+        objectSet=[object_spec],
+        propSet=[property_spec]
+    )
+    
+    collector = content.propertyCollector
+    page = collector.RetrievePropertiesEx(
+        specSet=[filter_spec],
+        options=vim.PropertyCollector.RetrieveOptions(maxObjects=page_size)
+    )
+    
+    result = []
+    while page:
+        result.extend((oc.obj, {p.name: p.val for p in oc.propSet}) for oc in page.objects)
+        if not page.token:
+            break
+        page = collector.ContinueRetrievePropertiesEx(token=page.token)
+    return result
+
+def get_datacenters(content, filter_names=None):
+    """
+    Get datacenters anywhere in the inventory, optionally filtered by name.
+    
+    The container view is recursive, so datacenters nested in folders are
+    found as well as those directly under the root folder.
+    
+    Args:
+        content: vSphere service content
+        filter_names (list): Datacenter names to keep (default: all)
+        
+    Returns:
+        list: vim.Datacenter objects
+    """
+    container = content.viewManager.CreateContainerView(
+        content.rootFolder, [vim.Datacenter], True)
+    
+    try:
+        if not filter_names:
+            return list(container.view)
+        
+        # Fetch every name in one call rather than one round-trip per datacenter
+        dc_props = retrieve_view_properties(content, container, vim.Datacenter, ['name'])
+        return [dc for dc, props in dc_props if props.get('name') in filter_names]
+    finally:
+        container.Destroy()